@@ -0,0 +1,45 @@
+"""Micro-benchmarks the Core response parsing path with each JSON codec.
+
+`legacy` is the old path: decode the body to text, parse it with `json`, and
+re-parse the request body that was just serialized.
+
+Run with `python -m benchmarks.bench_codec`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import timeit
+
+from benchmarks import recorded
+from plasticity.sapien.core import Core
+from plasticity.utils import codec
+
+
+def legacy(raw):
+    json.loads(raw.text)
+    json.loads(raw.request.body)
+
+
+def main(groups=(1, 100, 1000), number=None):
+    payload = {'text': '...', 'graph': True, 'ner': True}
+    codecs = [codec.get_codec(c.name) for c, m in codec.CODECS if m]
+    for n in groups:
+        raw = recorded.raw_response(recorded.scaled_core(n), payload)
+        times = number or max(1, 2000 // n)
+        cases = [('legacy decode', lambda: legacy(raw))]
+        for c in codecs:
+            cases.append(('{} decode'.format(c.name),
+                          lambda c=c: c.loads(raw.content)))
+            cases.append(('{} Core.Response'.format(c.name),
+                          lambda c=c: Core.Response(
+                              raw, request=payload, codec=c)))
+        for label, fn in cases:
+            best = min(timeit.repeat(fn, number=times, repeat=5)) / times
+            print('{:>5} groups  {:<24} {:>10.1f} us'.format(
+                n, label, best * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Measures the bytes on the wire for a large Core request and response,
+with and without compression, against a local stub server serving a
+recorded Core response. The text and response repeat, so they compress
+far better than real documents would.
+
+Run with `python -m benchmarks.bench_compression`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+
+from benchmarks import recorded
+from benchmarks.stub_server import StubServer
+from plasticity import Plasticity
+from plasticity.utils import compression
+
+TEXT = ('Play let it be by The Beatles. Sir James Paul McCartney is an '
+        'English singer, songwriter, and composer. ')
+
+
+def main(groups=200, count=20):
+    encodings = [c.name for c, m in compression.COMPRESSORS if m]
+    responses = {'/sapien/core/': recorded.scaled_core(groups)}
+    text = TEXT * groups
+    for response_encoding in [None] + encodings:
+        for request_encoding in [None] + encodings:
+            compress = (response_encoding,) if response_encoding else ()
+            with StubServer(responses=responses, compress=compress) as server:
+                plasticity = Plasticity(
+                    'token', url=server.url, compression=request_encoding)
+                start = time.time()
+                for _ in range(count):
+                    plasticity.sapien.core.post(text).data
+                elapsed = time.time() - start
+                plasticity.close()
+            print('request {:<8} response {:<8} {:>9.0f} B sent {:>9.0f} B '
+                  'received {:>8.2f} ms'.format(
+                      request_encoding or 'none',
+                      response_encoding or 'none',
+                      server.bytes_received / count,
+                      server.bytes_sent / count, elapsed / count * 1e3))
+
+
+if __name__ == '__main__':
+    main()
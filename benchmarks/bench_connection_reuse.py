@@ -0,0 +1,62 @@
+"""Compares requests/sec with and without keep-alive connection reuse.
+
+Run with `python -m benchmarks.bench_connection_reuse`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import time
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from plasticity import Plasticity
+from plasticity.base.transport import Transport
+
+
+class OneShotTransport(Transport):
+    """Opens a new connection for every request, like `requests.request`."""
+
+    def request(self, method, url, data=None, headers=None):
+        return requests.request(method, url, data=data, headers=headers)
+
+
+def post(plasticity, count):
+    for _ in range(count):
+        plasticity.sapien.core.post('This is an example.')
+
+
+def threaded(target, args, threads):
+    workers = [threading.Thread(target=target, args=args)
+               for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+
+def measure(label, target, args, threads, count):
+    start = time.time()
+    threaded(target, args + (count,), threads)
+    elapsed = time.time() - start
+    print('{:<32} {:>10.1f} req/s'.format(
+        label, threads * count / elapsed))
+
+
+def main(count=500, threads=(1, 8)):
+    with StubServer() as server:
+        for n in threads:
+            one_shot = Plasticity('token', url=server.url)
+            one_shot.transport = OneShotTransport()
+            measure('new connection ({} threads)'.format(n),
+                    post, (one_shot,), n, count)
+            pooled = Plasticity('token', url=server.url, pool_maxsize=n)
+            measure('pooled session ({} threads)'.format(n),
+                    post, (pooled,), n, count)
+            pooled.close()
+
+
+if __name__ == '__main__':
+    main()
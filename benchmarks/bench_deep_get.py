@@ -0,0 +1,44 @@
+"""Compares `utils.deep_get()` and a compiled `utils.KeyPath` with the
+`reduce()`-based `deep_get()` they replace, per lookup.
+
+Run with `python -m benchmarks.bench_deep_get`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+from functools import reduce
+
+from plasticity.utils import utils
+
+
+def legacy(dictionary, *keys):
+    return reduce(lambda d, key:
+                  d.get(key, None) if isinstance(d, dict) else None,
+                  keys, dictionary)
+
+
+def main(number=200000, repeat=5):
+    relation = {'subject': {'type': 'entity', 'entity': {'text': 'I'}}}
+    path = utils.KeyPath('subject', 'type')
+    missing = utils.KeyPath('object', 'type')
+    cases = [
+        ('reduce deep_get() (found)',
+         lambda: legacy(relation, 'subject', 'type')),
+        ('deep_get() (found)',
+         lambda: utils.deep_get(relation, 'subject', 'type')),
+        ('KeyPath (found)', lambda: path.get(relation)),
+        ('reduce deep_get() (missing)',
+         lambda: legacy(relation, 'object', 'type')),
+        ('deep_get() (missing)',
+         lambda: utils.deep_get(relation, 'object', 'type')),
+        ('KeyPath (missing)', lambda: missing.get(relation)),
+    ]
+    for label, fn in cases:
+        best = min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+        print('{:<30} {:>8.1f} ns/lookup'.format(label, best * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Benchmarks entity extraction on deeply nested relation graphs.
+
+`get_entities()` is the library's explicit stack traversal, `walk()`
+collects the entities from the generic `walk()` generator, and
+`recursive` is the old recursive traversal (with its shared default
+argument fixed, so the comparison is like for like). `recursive` can't
+walk graphs deeper than the recursion limit.
+
+Run with `python -m benchmarks.bench_graph_walk`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+from benchmarks import recorded
+from plasticity.sapien.core import (
+    Core, Entity, Preposition, Relation, walk)
+
+
+def recursive(relation, ner_only=False):
+    def helper(x, entities):
+        if isinstance(x, Entity):
+            if (not ner_only or x.ner) and x.index not in entities:
+                values = {'index': x.index, 'entity': x.entity}
+                if x.ner:
+                    values['ner'] = x.ner
+                entities[x.index] = values
+        elif isinstance(x, Relation):
+            helper(x.subject, entities)
+            helper(x.object, entities)
+            for preposition in x.prepositions:
+                helper(preposition.preposition_object, entities)
+        return entities
+    return helper(relation, {})
+
+
+def from_walk(relation, ner_only=False):
+    entities = {}
+    for x in walk([relation]):
+        if isinstance(x, Entity) and (x.ner or not ner_only) and \
+                x.index not in entities:
+            values = {'index': x.index, 'entity': x.entity}
+            if x.ner:
+                values['ner'] = x.ner
+            entities[x.index] = values
+    return entities
+
+
+def nested(depth):
+    """Builds a relation whose object is nested `depth` relations deep."""
+    response = Core.Response(recorded.raw_response(
+        recorded.load('core'), {'text': '...'}))
+    leaf = response.data[0].alternatives[0].graph[0]
+    relation = leaf
+    for i in range(depth):
+        preposition = Preposition([], 'by', leaf.subject, [], i, None)
+        relation = Relation(
+            [], False, None, [], leaf.subject, leaf.predicate, relation, [],
+            [preposition], None, False, True, False, None, [], 1.0, False)
+    return relation
+
+
+def main(depths=(10, 100, 400, 5000), repeat=5):
+    for depth in depths:
+        relation = nested(depth)
+        number = max(1, 10000 // depth)
+        cases = [('get_entities()', lambda: relation.get_entities()),
+                 ('walk()', lambda: from_walk(relation))]
+        if depth < 450:
+            cases.append(('recursive', lambda: recursive(relation)))
+        for label, fn in cases:
+            best = min(timeit.repeat(fn, number=number, repeat=repeat))
+            print('depth {:>5}  {:<14} {:>10.1f} us'.format(
+                depth, label, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Compares eager and lazy parsing of large recorded Core responses.
+
+Eager parsing is emulated by touching every level of the object model, which
+is what `Core.Response` used to do on construction.
+
+Run with `python -m benchmarks.bench_lazy_parsing`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+from benchmarks import recorded
+from plasticity.sapien.core import Core
+
+
+def materialize(response):
+    """Builds every `SentenceGroup`, `Sentence` and `Graph`."""
+    for sentence_group in response.data:
+        for sentence in sentence_group.alternatives:
+            sentence.graph
+    return response
+
+
+def main(groups=(100, 1000, 5000), repeat=5):
+    payload = {'text': '...', 'graph': True, 'ner': True}
+    for n in groups:
+        raw = recorded.raw_response(recorded.scaled_core(n), payload)
+        cases = [
+            ('eager', lambda: materialize(Core.Response(raw))),
+            ('lazy + tokenize()', lambda: Core.Response(raw).tokenize()),
+            ('lazy + graphs()', lambda: Core.Response(raw).graphs()),
+        ]
+        for label, fn in cases:
+            best = min(timeit.repeat(fn, number=1, repeat=repeat))
+            print('{:>5} groups  {:<20} {:>9.2f} ms'.format(
+                n, label, best * 1000))
+
+
+if __name__ == '__main__':
+    main()
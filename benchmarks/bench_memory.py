@@ -0,0 +1,81 @@
+"""Measures the memory held per sentence by a fully built Core response.
+
+The `__slots__` classes of the result tree are compared with a baseline
+of `__dict__`-backed subclasses of the same classes, which is how they
+were built before they declared `__slots__`.
+
+Run with `python -m benchmarks.bench_memory`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import contextlib
+import gc
+import tracemalloc
+
+from benchmarks import recorded
+from benchmarks.bench_lazy_parsing import materialize
+from plasticity.sapien import core
+from plasticity.sapien.core import Core
+
+# The classes of the result tree that declare `__slots__`
+SLOTTED = ('SentenceGroup', 'Sentence', 'Graph', 'Relation', 'Entity',
+           'Predicate', 'Preposition', 'Concept')
+
+
+def graph_init(self, relations):
+    list.__init__(self, relations)
+
+
+@contextlib.contextmanager
+def dict_backed():
+    """Builds the result tree from `__dict__`-backed subclasses.
+
+    A subclass that doesn't declare `__slots__` gets a `__dict__`, and the
+    tree is built through the module's names, so they are swapped for
+    these subclasses while the context is active.
+    """
+    originals = {name: getattr(core, name) for name in SLOTTED}
+    try:
+        for name, cls in originals.items():
+            namespace = {}
+            if name == 'Graph':
+                # `Graph.__init__` calls `super(Graph, ...)` by name, which
+                # would be the subclass itself
+                namespace['__init__'] = graph_init
+            setattr(core, name, type(name, (cls,), namespace))
+        yield
+    finally:
+        for name, cls in originals.items():
+            setattr(core, name, cls)
+
+
+def measure(raw, payload):
+    """Gets the bytes held by the decoded json and by the object model."""
+    gc.collect()
+    tracemalloc.start()
+    response = Core.Response(raw, request=payload)
+    decoded = tracemalloc.get_traced_memory()[0]
+    materialize(response)
+    built = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    sentences = sum(len(g.alternatives) for g in response.data)
+    return sentences, decoded, built - decoded
+
+
+def main(groups=(1000, 10000)):
+    payload = {'text': '...', 'graph': True, 'ner': True}
+    for n in groups:
+        raw = recorded.raw_response(recorded.scaled_core(n), payload)
+        sentences, decoded, built = measure(raw, payload)
+        with dict_backed():
+            _, _, baseline = measure(raw, payload)
+        print('{:>6} sentences  json {:>7.0f} B/sentence  objects '
+              '{:>7.0f} B/sentence ({:.0f} with __dict__)'.format(
+                  sentences, decoded / sentences, built / sentences,
+                  baseline / sentences))
+
+
+if __name__ == '__main__':
+    main()
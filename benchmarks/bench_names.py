@@ -0,0 +1,62 @@
+"""Compares the `Names.Response` predicates with the `deep_get` chains they
+used to run on every call, and with `classify_many()`.
+
+Run with `python -m benchmarks.bench_names`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+from benchmarks import recorded
+from plasticity.sapien.names import Names, classify_many
+from plasticity.utils import utils
+
+
+def legacy_is_first_name(data):
+    is_male = utils.deep_get(data, 'isMaleName', 'value')
+    is_m_certain = utils.deep_get(
+        data, 'isMaleName', 'confidence') == 'Certain'
+    is_female = utils.deep_get(data, 'isFemaleName', 'value')
+    is_f_certain = utils.deep_get(
+        data, 'isFemaleName', 'confidence') == 'Certain'
+    return (is_male and is_m_certain) or (is_female and is_f_certain)
+
+
+def legacy_all(data):
+    for field in ('isName', 'isMaleName', 'isFemaleName', 'isFamilyName'):
+        (utils.deep_get(data, field, 'value') and
+         utils.deep_get(data, field, 'confidence') == 'Certain')
+    legacy_is_first_name(data)
+
+
+def all_predicates(response):
+    response.is_name()
+    response.is_male_name()
+    response.is_female_name()
+    response.is_first_name()
+    response.is_family_name()
+
+
+def main(count=10000, repeat=5):
+    raw = recorded.raw_response(recorded.load('names'), {'name': 'sarah'})
+    responses = [Names.Response(raw) for _ in range(count)]
+    cases = [
+        ('deep_get is_first_name()',
+         lambda: [legacy_is_first_name(r.data) for r in responses]),
+        ('record is_first_name()',
+         lambda: [r.is_first_name() for r in responses]),
+        ('deep_get all 5 predicates',
+         lambda: [legacy_all(r.data) for r in responses]),
+        ('record all 5 predicates',
+         lambda: [all_predicates(r) for r in responses]),
+        ('classify_many()', lambda: classify_many(responses)),
+    ]
+    for label, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=repeat)) / count
+        print('{:<28} {:>8.3f} us/response'.format(label, best * 1e6))
+
+
+if __name__ == '__main__':
+    main()
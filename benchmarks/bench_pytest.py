@@ -0,0 +1,40 @@
+"""Runs the `bench_suite` workloads under pytest-benchmark, so runs can be
+saved and compared for regressions:
+
+    pytest benchmarks/bench_pytest.py --benchmark-autosave
+    pytest benchmarks/bench_pytest.py --benchmark-compare
+
+The file isn't named `test_*.py`, so the regular test run skips it.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import pytest
+
+from benchmarks.bench_suite import MODES, WORKLOADS, StubProcess
+from plasticity import Plasticity
+
+pytest.importorskip('pytest_benchmark')
+
+COUNT = 50
+WORKERS = 8
+
+
+@pytest.fixture(scope='module')
+def url():
+    with StubProcess(core_groups=100, latency=0.001) as url:
+        yield url
+
+
+@pytest.mark.parametrize('mode', sorted(MODES))
+@pytest.mark.parametrize('name', sorted(WORKLOADS))
+def test_client(benchmark, url, name, mode):
+    attribute, payload, consume = WORKLOADS[name]
+    plasticity = Plasticity('token', url=url, pool_maxsize=WORKERS)
+    endpoint = getattr(plasticity.sapien, attribute)
+    benchmark.extra_info['requests'] = COUNT
+    benchmark.pedantic(MODES[mode], args=(
+        endpoint, payload, consume, COUNT, WORKERS), rounds=5,
+        warmup_rounds=1)
+    plasticity.close()
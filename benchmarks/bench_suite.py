@@ -0,0 +1,232 @@
+"""Benchmarks the client end to end against a stub server replaying the
+recorded Core, Names and Transform responses.
+
+Each endpoint is measured in three modes: `single` (sequential `post()`s),
+`batch` (`post_many()`) and `concurrent` (threads calling `post()`). For
+each, it reports the throughput, the p50/p99 latency of a request, the
+time spent decoding, building and reading each response ("parse"), the
+client's total CPU time per request and the peak memory the client
+allocated. The stub server runs in a subprocess, so its CPU and memory
+aren't counted.
+
+Run it standalone with `python -m benchmarks.bench_suite` (see `--help`),
+or with pytest-benchmark: `pytest benchmarks/bench_pytest.py`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.bench_lazy_parsing import materialize
+from plasticity import Plasticity
+from plasticity.base.observer import Observer, timer
+
+try:
+    import tracemalloc
+except ImportError:  # module wasn't added until Python 3.4
+    tracemalloc = None
+
+try:
+    cpu_timer = time.process_time
+except AttributeError:  # function wasn't added until Python 3.3
+    cpu_timer = time.clock
+
+
+def consume_core(result):
+    if not result.error:
+        materialize(result)
+        result.tokenize()
+
+
+def consume_names(result):
+    if not result.error:
+        result.is_name()
+
+
+def consume_transform(result):
+    result.data
+
+
+# The endpoint, the payload and how a response is read, for each endpoint
+WORKLOADS = {
+    'core': ('core', ('Play let it be by The Beatles. Sir Paul McCartney '
+                      'wrote it.',), consume_core),
+    'names': ('names', ('Sarah',), consume_names),
+    'transform': ('transform', ('leaf', 'NounPlural'), consume_transform),
+}
+
+
+def run_single(endpoint, payload, consume, count, workers):
+    for _ in range(count):
+        consume(endpoint.post(*payload))
+
+
+def run_batch(endpoint, payload, consume, count, workers):
+    for result in endpoint.post_many([payload] * count, workers=workers):
+        consume(result)
+
+
+def run_concurrent(endpoint, payload, consume, count, workers):
+    def work(n):
+        for _ in range(n):
+            consume(endpoint.post(*payload))
+    threads = [threading.Thread(target=work, args=(
+        count // workers + (i < count % workers),)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+MODES = {
+    'single': run_single,
+    'batch': run_batch,
+    'concurrent': run_concurrent,
+}
+
+
+class Recorder(Observer):
+    """Records the latency and decode/build time of every request."""
+
+    def __init__(self):
+        self.latencies = []
+        self.parse = []
+        self.errors = 0
+
+    def post_response(self, event):
+        timings = event.timings
+        self.latencies.append(timings['total'])
+        self.parse.append(timings['decode'] + timings['build'])
+        self.errors += event.error
+
+    def on_error(self, event):
+        self.latencies.append(event.timings['total'])
+        self.errors += 1
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class StubProcess(object):
+    """Runs `benchmarks.stub_server` in a subprocess, serving the recorded
+    responses. Use it as a context manager; it returns the server's url.
+    """
+
+    def __init__(self, core_groups=None, latency=0, jitter=0, error_rate=0):
+        self.args = [sys.executable, '-m', 'benchmarks.stub_server',
+                     '--port', '0', '--recorded', '--latency', str(latency),
+                     '--jitter', str(jitter), '--error-rate', str(error_rate)]
+        if core_groups:
+            self.args += ['--core-groups', str(core_groups)]
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            self.args, stdout=subprocess.PIPE, universal_newlines=True)
+        return self.process.stdout.readline().split()[-1]
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        self.process.wait()
+        self.process.stdout.close()
+
+
+def measure(url, name, mode, count, workers, memory=True):
+    """Runs one workload in one mode and measures it.
+
+    :returns: The measurements by name
+    :rtype: {dict}
+    """
+    attribute, payload, consume = WORKLOADS[name]
+    recorder = Recorder()
+    plasticity = Plasticity('token', url=url, pool_maxsize=workers,
+                            observers=[recorder])
+    endpoint = getattr(plasticity.sapien, attribute)
+    reading = []
+
+    def timed_consume(result):
+        start = timer()
+        consume(result)
+        reading.append(timer() - start)
+
+    # Warms up the connections
+    MODES[mode](endpoint, payload, consume, workers, workers)
+    del recorder.latencies[:], recorder.parse[:]
+    recorder.errors = 0
+
+    cpu, start = cpu_timer(), timer()
+    MODES[mode](endpoint, payload, timed_consume, count, workers)
+    elapsed, cpu = timer() - start, cpu_timer() - cpu
+    results = {
+        'throughput': count / elapsed,
+        'p50': percentile(recorder.latencies, 0.5),
+        'p99': percentile(recorder.latencies, 0.99),
+        'parse': (sum(recorder.parse) + sum(reading)) / count,
+        'cpu': cpu / count,
+        'errors': recorder.errors,
+        'peak': None,
+    }
+    if memory and tracemalloc is not None:
+        # A separate pass, since tracing slows everything down
+        tracemalloc.start()
+        MODES[mode](endpoint, payload, consume, count, workers)
+        results['peak'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    plasticity.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.bench_suite',
+        description='Benchmarks the client against a stub server.')
+    parser.add_argument('-n', '--count', type=int, default=200,
+                        help='The requests per measurement (default: 200).')
+    parser.add_argument('-w', '--workers', type=int, default=8,
+                        help='The threads of the batch and concurrent modes '
+                             '(default: 8).')
+    parser.add_argument('--endpoints', nargs='+', default=sorted(WORKLOADS),
+                        choices=sorted(WORKLOADS))
+    parser.add_argument('--modes', nargs='+',
+                        default=['single', 'batch', 'concurrent'],
+                        choices=sorted(MODES))
+    parser.add_argument('--core-groups', type=int, default=100,
+                        help='The sentence groups of the Core response '
+                             '(default: 100).')
+    parser.add_argument('--latency', type=float, default=0.001,
+                        help='The stub server latency in seconds '
+                             '(default: 0.001).')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='The max extra random latency in seconds.')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='The fraction of requests that fail.')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the peak memory pass.')
+    args = parser.parse_args(argv)
+
+    print('{:<10} {:<11} {:>9} {:>9} {:>9} {:>10} {:>9} {:>7} {:>10}'.format(
+        'endpoint', 'mode', 'req/s', 'p50 ms', 'p99 ms', 'parse ms',
+        'cpu ms', 'errors', 'peak KiB'))
+    with StubProcess(args.core_groups, args.latency, args.jitter,
+                     args.error_rate) as url:
+        for name in args.endpoints:
+            for mode in args.modes:
+                r = measure(url, name, mode, args.count, args.workers,
+                            memory=not args.no_memory)
+                print('{:<10} {:<11} {:>9.0f} {:>9.2f} {:>9.2f} {:>10.3f} '
+                      '{:>9.3f} {:>7} {:>10}'.format(
+                          name, mode, r['throughput'], r['p50'] * 1e3,
+                          r['p99'] * 1e3, r['parse'] * 1e3, r['cpu'] * 1e3,
+                          r['errors'], '-' if r['peak'] is None
+                          else '{:.0f}'.format(r['peak'] / 1024)))
+
+
+if __name__ == '__main__':
+    main()
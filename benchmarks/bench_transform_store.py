@@ -0,0 +1,58 @@
+"""Compares Transform lookups answered by a `TransformStore` with requests
+to a local stub server.
+
+Run with `python -m benchmarks.bench_transform_store`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import timeit
+
+from benchmarks.stub_server import StubServer
+from plasticity import Plasticity
+from plasticity.sapien.transform import TransformStore
+
+
+def main(sizes=(1000, 100000), number=20000):
+    directory = tempfile.mkdtemp()
+    try:
+        with StubServer() as server:
+            transform = Plasticity('token', url=server.url).sapien.transform
+            best = min(timeit.repeat(
+                lambda: transform.post('leaf', 'NounPlural'), number=200,
+                repeat=3)) / 200
+            print('{:<40} {:>10.2f} us'.format('post() over HTTP', best * 1e6))
+            for n in sizes:
+                path = os.path.join(directory, '{}.table'.format(n))
+                store = TransformStore(path)
+                store.update(('word{}'.format(i), 'NounPlural',
+                              'words{}'.format(i)) for i in range(n))
+                store.save()
+                transform.store = store
+                cases = [
+                    ('store.get() hit', lambda: store.get(
+                        'word7', 'NounPlural')),
+                    ('store.get() miss', lambda: store.get(
+                        'word7', 'VerbPast')),
+                    ('post() from the store', lambda: transform.post(
+                        'word7', 'NounPlural')),
+                ]
+                for label, fn in cases:
+                    best = min(timeit.repeat(
+                        fn, number=number, repeat=3)) / number
+                    print('{:<40} {:>10.2f} us'.format(
+                        '{} ({} entries)'.format(label, n), best * 1e6))
+                print('{:<40} {:>10.1f} B/entry'.format(
+                    'file size ({} entries)'.format(n),
+                    os.path.getsize(path) / n))
+                store.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Recorded Plasticity API responses used by the benchmarks."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+
+from plasticity.base.transport import RawResponse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'fixtures')
+
+
+def load(name):
+    """Loads the recorded response body of an endpoint (e.g. 'core')."""
+    with open(os.path.join(FIXTURES, name + '.json')) as f:
+        return json.load(f)
+
+
+def scaled_core(groups):
+    """Builds a large Core response body with `groups` sentence groups by
+    repeating the recorded ones.
+    """
+    recorded = load('core')
+    data = [recorded['data'][i % len(recorded['data'])]
+            for i in range(groups)]
+    # Round-trip so no two sentence groups share any objects
+    return json.loads(json.dumps({'data': data, 'error': False}))
+
+
+def responses(core_groups=None):
+    """Gets the recorded response bodies by request path, for a
+    `StubServer`.
+
+    :param core_groups: Scale the Core response to this many sentence
+                        groups, defaults to None (as recorded)
+    :type core_groups: int, optional
+    """
+    return {
+        '/sapien/core/': (scaled_core(core_groups) if core_groups
+                          else load('core')),
+        '/sapien/names/': load('names'),
+        '/sapien/transform/': load('transform'),
+    }
+
+
+def raw_response(body, payload):
+    """Wraps a response body and its request payload in a `RawResponse`."""
+    return RawResponse(200, json.dumps(body).encode('utf-8'),
+                       body=json.dumps(payload))
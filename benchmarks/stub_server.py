@@ -0,0 +1,269 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import random
+import socket
+import sys
+import threading
+import time
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from benchmarks import recorded
+from plasticity.utils.compression import get_compressor_for
+
+
+RESPONSES = {
+    '/sapien/core/': {
+        'data': [{
+            'type': 'sentence',
+            'sentence': 'This is an example.',
+            'tokens': [['This', 'DT', 'this'], ['is', 'VBZ', 'be'],
+                       ['an', 'DT', 'a'], ['example', 'NN', 'example'],
+                       ['.', 'PERIOD', '.']],
+            'dependencies': [[0, 1, 'nsubj'], [1, -1, 'ROOT'],
+                             [2, 3, 'det'], [3, 1, 'attr'],
+                             [4, 1, 'punct']],
+            'graph': None,
+        }],
+        'error': False,
+    },
+    '/sapien/names/': {
+        'data': {
+            'isName': {'value': True, 'confidence': 'Certain'},
+            'isMaleName': {'value': False, 'confidence': 'Certain'},
+            'isFemaleName': {'value': True, 'confidence': 'Certain'},
+            'isFamilyName': {'value': False, 'confidence': 'Certain'},
+        },
+        'error': False,
+    },
+    '/sapien/transform/': {
+        'data': 'leaves',
+        'error': False,
+    },
+}
+
+
+class StubRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answers every request with a canned Plasticity API response."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # noqa: N802
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            self.respond()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def respond(self):
+        length = int(self.headers.get('content-length') or 0)
+        body = self.rfile.read(length)
+        with self.server.lock:
+            self.server.bytes_received += length
+        encoding = self.headers.get('content-encoding')
+        if encoding:
+            self.server.request_bodies.append(
+                get_compressor_for(encoding).decompress(body))
+        else:
+            self.server.request_bodies.append(body)
+        latency = self.server.get_latency()
+        if latency:
+            time.sleep(latency)
+        headers = {}
+        failure = self.server.get_failure()
+        if failure is not None:
+            status, headers = failure
+            self.send_response(status)
+            encoded = json.dumps({'error': True, 'errorCode': status,
+                                  'message': 'Injected failure.'})
+            encoded = encoded.encode('utf-8')
+        else:
+            encoded = self.server.get_encoded(self.path)
+            if encoded is None:
+                self.send_response(404)
+                encoded = json.dumps({'error': True, 'errorCode': 404,
+                                      'message': 'Unknown endpoint.'})
+                encoded = encoded.encode('utf-8')
+            else:
+                self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        accepted = self.headers.get('accept-encoding') or ''
+        for encoding in self.server.compress:
+            if encoding in accepted:
+                encoded = get_compressor_for(encoding).compress(encoded)
+                self.send_header('content-encoding', encoding)
+                break
+        self.send_header('content-length', str(len(encoded)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        # Counted before the client can read the response and look
+        with self.server.lock:
+            self.server.bytes_sent += len(encoded)
+            self.server.request_count += 1
+        self.wfile.write(encoded)
+
+    do_GET = do_POST  # noqa: N815
+    do_DELETE = do_POST  # noqa: N815
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """A local HTTP server that mimics the Plasticity API.
+
+    Use it as a context manager; `url` is suitable for `Plasticity(url=...)`.
+    `responses` maps request paths to response bodies (see
+    `benchmarks.recorded.responses()` for recorded ones); they are encoded
+    once, on first use.
+
+    Every response waits `latency` seconds plus up to `jitter` more. A
+    fraction `error_rate` of the requests fail with `error_status` at
+    random, and `(status, headers)` pairs appended to `failures` answer
+    the next requests with those errors instead. Responses are compressed
+    with the first of the `compress` encodings the client accepts.
+
+    The (decompressed) request bodies received are kept in
+    `request_bodies`. The body bytes on the wire are counted in
+    `bytes_received` and `bytes_sent`, and the requests and connections
+    accepted in `request_count` and `connection_count`. `max_in_flight`
+    is the most requests that were being answered at once.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, responses=None, latency=0,
+                 compress=(), jitter=0, error_rate=0, error_status=503,
+                 seed=None):
+        BaseHTTPServer.HTTPServer.__init__(
+            self, (host, port), StubRequestHandler)
+        self.responses = dict(RESPONSES if responses is None else responses)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.request_count = 0
+        self.connection_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.failures = collections.deque()
+        self.compress = compress
+        self.request_bodies = collections.deque(maxlen=100)
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._encoded = {}
+        self._random = random.Random(seed)
+        self._thread = None
+
+    def process_request(self, request, client_address):
+        # Runs on the serving thread only, so it needs no lock
+        self.connection_count += 1
+        socketserver.ThreadingMixIn.process_request(
+            self, request, client_address)
+
+    def handle_error(self, request, client_address):
+        # A client that timed out and hung up (e.g. while testing timeouts)
+        # isn't an error of the server
+        if isinstance(sys.exc_info()[1], socket.error):
+            return
+        BaseHTTPServer.HTTPServer.handle_error(
+            self, request, client_address)
+
+    def get_latency(self):
+        """Gets the seconds to wait before the next response."""
+        if self.jitter:
+            return self.latency + self._random.uniform(0, self.jitter)
+        return self.latency
+
+    def get_failure(self):
+        """Gets the `(status, headers)` of an injected failure, or `None`."""
+        if self.failures:
+            try:
+                return self.failures.popleft()
+            except IndexError:
+                pass
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self.error_status, {}
+        return None
+
+    def get_encoded(self, path):
+        """Gets the encoded response body for a path, or `None`."""
+        encoded = self._encoded.get(path)
+        if encoded is None and path in self.responses:
+            encoded = self._encoded[path] = json.dumps(
+                self.responses[path]).encode('utf-8')
+        return encoded
+
+    @property
+    def url(self):
+        return 'http://{}:{}/'.format(*self.server_address[:2])
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.stub_server',
+        description='Serves a stub Plasticity API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='The port (default: 8765, 0 for any).')
+    parser.add_argument('--recorded', action='store_true',
+                        help='Serve the recorded responses instead of the '
+                             'small canned ones.')
+    parser.add_argument('--core-groups', type=int,
+                        help='With --recorded, scale the Core response to '
+                             'this many sentence groups.')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='The seconds to wait before each response.')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='The max extra random seconds of latency.')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='The fraction of requests that fail.')
+    parser.add_argument('--error-status', type=int, default=503,
+                        help='The status of failed requests (default: 503).')
+    args = parser.parse_args(argv)
+    responses = (recorded.responses(args.core_groups)
+                 if args.recorded else None)
+    server = StubServer(args.host, args.port, responses=responses,
+                        latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate,
+                        error_status=args.error_status)
+    print('Serving the stub Plasticity API on {}'.format(server.url))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,13 @@ from __future__ import print_function
 
 import os
 
+from plasticity.base.limiter import AdaptiveConcurrency, RateLimiter
+from plasticity.base.retry import Retry
+from plasticity.base.singleflight import SingleFlight
+from plasticity.base.transport import Transport
+from plasticity.utils.codec import get_codec
+from plasticity.utils.compression import get_compressor
+
 
 class Plasticity(object):
     """A Plasticity class that holds the user's API token and
@@ -12,13 +19,96 @@ class Plasticity(object):
     Attributes:
         token: An API token to authenticate with the API
         url: A local or remote Plasticity API url to use
+        transport: The pooled HTTP transport shared by every endpoint
+        cache: An optional `Cache` of responses shared by every endpoint
+        single_flight: An optional `SingleFlight` coalescing identical
+                       requests in flight
+        codec: The JSON codec used to encode requests and decode responses
+        compressor: The compressor of request bodies, or `None`
+        compress_min_size: The smallest request body that is compressed
+        rate_limiter: An optional `RateLimiter` shared by every endpoint
+        concurrency: An optional `AdaptiveConcurrency` limit shared by every
+                     endpoint
+        observers: The `Observer`s notified of every request; may be changed
+                   at any time
     """
 
-    def __init__(self, token=None, url=None, environment=None):
-        """Initializes a new Plasticity object."""
+    def __init__(self, token=None, url=None, environment=None,
+                 pool_connections=10, pool_maxsize=10, cache=None,
+                 coalesce=False, codec=None, connect_timeout=10.0,
+                 read_timeout=120.0, retries=3, rate_limit=None,
+                 concurrency=None, observers=None, compression=None,
+                 compress_min_size=1024):
+        """Initializes a new Plasticity object.
+
+        :param pool_connections: The number of hosts to keep connection
+                                 pools for, defaults to 10
+        :type pool_connections: int, optional
+        :param pool_maxsize: The max number of keep-alive connections per
+                             host, defaults to 10
+        :type pool_maxsize: int, optional
+        :param cache: A response cache (e.g. a `MemoryCache`), defaults to
+                      None (no caching)
+        :type cache: Cache, optional
+        :param coalesce: Send identical requests made at the same time (e.g.
+                         from several threads) only once, defaults to False
+        :type coalesce: bool, optional
+        :param codec: The JSON codec, or the name of one ('orjson', 'ujson'
+                      or 'json'), defaults to the fastest one installed
+        :type codec: JSONCodec|str, optional
+        :param connect_timeout: The seconds to wait for a connection to the
+                                API, defaults to 10
+        :type connect_timeout: number, optional
+        :param read_timeout: The seconds to wait for the API to respond,
+                             defaults to 120
+        :type read_timeout: number, optional
+        :param retries: The number of times a request that failed
+                        transiently (a 429 or 5xx status, a connection error
+                        or a timeout) is retried, or a `Retry` policy,
+                        defaults to 3
+        :type retries: int|Retry, optional
+        :param rate_limit: The max number of requests per second sent by
+                           every endpoint combined, or a `RateLimiter`,
+                           defaults to None (unlimited)
+        :type rate_limit: number|RateLimiter, optional
+        :param concurrency: Adapt the number of requests in flight to the
+                            API's load: True, or an `AdaptiveConcurrency`
+                            to configure it (True starts at, and never
+                            exceeds, `pool_maxsize`), defaults to None
+        :type concurrency: bool|AdaptiveConcurrency, optional
+        :param observers: The `Observer`s (e.g. a `Metrics`) notified of
+                          every request, defaults to None
+        :type observers: list, optional
+        :param compression: Compress request bodies with a compressor or
+                            the name of one ('gzip', 'deflate', 'br' or
+                            'zstd'), defaults to None (no compression)
+        :type compression: GzipCompressor|str, optional
+        :param compress_min_size: The smallest request body in bytes that is
+                                  compressed, defaults to 1024
+        :type compress_min_size: int, optional
+        """
         environment = environment or os.environ
         self.url = url or 'https://api.plasticity.ai/'
         self.token = token or environment.get('PLASTICITY_API_KEY')
+        if rate_limit is not None and not isinstance(
+                rate_limit, RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
+        if concurrency is True:
+            concurrency = AdaptiveConcurrency(
+                initial=pool_maxsize, max_limit=pool_maxsize)
+        self.transport = Transport(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+            timeout=(connect_timeout, read_timeout),
+            retry=Retry.from_value(retries), rate_limiter=rate_limit,
+            concurrency=concurrency or None)
+        self.rate_limiter = self.transport.rate_limiter
+        self.concurrency = self.transport.concurrency
+        self.cache = cache
+        self.single_flight = SingleFlight() if coalesce else None
+        self.codec = get_codec(codec)
+        self.compressor = get_compressor(compression)
+        self.compress_min_size = compress_min_size
+        self.observers = list(observers or [])
 
         # Services
         self._sapien = None
@@ -37,3 +127,7 @@ class Plasticity(object):
             from plasticity.cortex import Cortex
             self._cortex = Cortex(self)
         return self._cortex
+
+    def close(self):
+        """Closes the pooled connections held by this Plasticity object."""
+        self.transport.close()
@@ -0,0 +1,8 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from plasticity.cli import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import asyncio
+import os
+
+from plasticity.utils.codec import get_codec
+
+
+class AsyncPlasticity(object):
+    """An asyncio variant of `Plasticity` that holds the user's API token
+    and location (url) of the API to be used.
+
+    Its service tree mirrors `Plasticity`, but every endpoint call is a
+    coroutine:
+
+    ```python
+    async with AsyncPlasticity('<YOUR_TOKEN>') as plasticity:
+        result = await plasticity.sapien.core.post('This is an example.')
+    ```
+
+    Requires the `aiohttp` package (`pip install plasticity[async]`).
+
+    Attributes:
+        token: An API token to authenticate with the API
+        url: A local or remote Plasticity API url to use
+        pool_maxsize: The max number of open connections per host
+        max_concurrency: The max number of requests in flight at once
+        codec: The JSON codec used to encode requests and decode responses
+    """
+
+    def __init__(self, token=None, url=None, environment=None,
+                 pool_maxsize=100, max_concurrency=1000, codec=None):
+        """Initializes a new AsyncPlasticity object.
+
+        :param pool_maxsize: The max number of open connections per host,
+                             defaults to 100
+        :type pool_maxsize: int, optional
+        :param max_concurrency: The max number of requests in flight at
+                                once, defaults to 1000
+        :type max_concurrency: int, optional
+        :param codec: The JSON codec, or the name of one ('orjson', 'ujson'
+                      or 'json'), defaults to the fastest one installed
+        :type codec: JSONCodec|str, optional
+        """
+        environment = environment or os.environ
+        self.url = url or 'https://api.plasticity.ai/'
+        self.token = token or environment.get('PLASTICITY_API_KEY')
+        self.pool_maxsize = pool_maxsize
+        self.max_concurrency = max_concurrency
+        self.codec = get_codec(codec)
+        self._session = None
+        self._semaphore = None
+
+        # Services
+        self._sapien = None
+        self._cortex = None
+
+    @property
+    def session(self):
+        """The shared `aiohttp.ClientSession`, created on first use.
+
+        This must be first accessed from within a running event loop.
+        """
+        if self._session is None or self._session.closed:
+            try:
+                import aiohttp
+            except ImportError:
+                raise ImportError('The `aiohttp` package is required to use '
+                                  '`AsyncPlasticity`. Install it with '
+                                  '`pip install plasticity[async]`.')
+            connector = aiohttp.TCPConnector(
+                limit=0, limit_per_host=self.pool_maxsize)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    @property
+    def semaphore(self):
+        """The semaphore bounding the number of requests in flight."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def sapien(self):
+        if self._sapien is None:
+            from plasticity.aio.sapien import AsyncSapien
+            self._sapien = AsyncSapien(self)
+        return self._sapien
+
+    @property
+    def cortex(self):
+        if self._cortex is None:
+            from plasticity.aio.cortex import AsyncCortex
+            self._cortex = AsyncCortex(self)
+        return self._cortex
+
+    async def close(self):
+        """Closes the pooled connections held by this object."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,14 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from plasticity.base.service import Service
+
+
+class AsyncCortex(Service):
+    """The asyncio counterpart of `Cortex`, the API service for knowledge."""
+
+    def __init__(self, plasticity):
+        """Initializes a new AsyncCortex Service."""
+        super(AsyncCortex, self).__init__(plasticity)
+        self.url = self.plasticity.url + 'cortex/'
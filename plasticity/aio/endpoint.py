@@ -0,0 +1,54 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import asyncio
+
+from plasticity.base.transport import RawResponse
+
+
+class AsyncEndpoint(object):
+    """An AsyncEndpoint is the asyncio counterpart of an `Endpoint`.
+
+    It reuses the payload handling and `Response` class of the synchronous
+    endpoint named by `ENDPOINT`, so responses are parsed by exactly the
+    same code.
+
+    Attributes:
+        plasticity: an AsyncPlasticity instance with the API URL and token
+    """
+    ENDPOINT = None
+
+    def __init__(self, plasticity):
+        """Initializes a new AsyncEndpoint."""
+        self.plasticity = plasticity
+        self.headers = {}
+        self.headers['content-type'] = 'application/json'
+        if self.plasticity.token:
+            self.headers['authorization'] = 'Bearer ' + self.plasticity.token
+
+    async def _request(self, method, *args, **kwargs):
+        payload = self.ENDPOINT.get_payload_from_args(args, kwargs)
+        body = self.plasticity.codec.dumps(payload)
+        async with self.plasticity.semaphore:
+            try:
+                async with self.plasticity.session.request(
+                        method, self.url, data=body,
+                        headers=self.headers) as response:
+                    content = await response.read()
+            except asyncio.TimeoutError:
+                raise self.ENDPOINT.PlasticityAPITimeoutError(
+                    'The request timed out.')
+        return self.ENDPOINT.Response(
+            RawResponse(response.status, content, body=body,
+                        headers=response.headers, encoding=response.charset),
+            request=payload, codec=self.plasticity.codec)
+
+    async def post(self, *args, **kwargs):
+        return await self._request('POST', *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._request('GET', *args, **kwargs)
+
+    async def delete(self, *args, **kwargs):
+        return await self._request('DELETE', *args, **kwargs)
@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from plasticity.aio.endpoint import AsyncEndpoint
+from plasticity.base.service import Service
+from plasticity.sapien.core import Core
+from plasticity.sapien.names import Names
+from plasticity.sapien.transform import Transform
+
+
+class AsyncSapien(Service):
+    """The asyncio counterpart of `Sapien`, the API service for language."""
+
+    def __init__(self, plasticity):
+        """Initializes a new AsyncSapien Service."""
+        super(AsyncSapien, self).__init__(plasticity)
+        self.url = self.plasticity.url + 'sapien/'
+
+        # Endpoints
+        self._core = None
+        self._transform = None
+        self._names = None
+
+    @property
+    def core(self):
+        if self._core is None:
+            self._core = AsyncCore(self.plasticity)
+        return self._core
+
+    @property
+    def transform(self):
+        if self._transform is None:
+            self._transform = AsyncTransform(self.plasticity)
+        return self._transform
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = AsyncNames(self.plasticity)
+        return self._names
+
+
+class AsyncCore(AsyncEndpoint):
+    """The asyncio counterpart of `Core`. Returns `Core.Response`s."""
+    ENDPOINT = Core
+
+    def __init__(self, plasticity):
+        """Initializes a new AsyncCore Endpoint."""
+        super(AsyncCore, self).__init__(plasticity)
+        self.url = self.plasticity.sapien.url + 'core/'
+
+
+class AsyncNames(AsyncEndpoint):
+    """The asyncio counterpart of `Names`. Returns `Names.Response`s."""
+    ENDPOINT = Names
+
+    def __init__(self, plasticity):
+        """Initializes a new AsyncNames Endpoint."""
+        super(AsyncNames, self).__init__(plasticity)
+        self.url = self.plasticity.sapien.url + 'names/'
+
+
+class AsyncTransform(AsyncEndpoint):
+    """The asyncio counterpart of `Transform`."""
+    ENDPOINT = Transform
+
+    def __init__(self, plasticity):
+        """Initializes a new AsyncTransform Endpoint."""
+        super(AsyncTransform, self).__init__(plasticity)
+        self.url = self.plasticity.sapien.url + 'transform/'
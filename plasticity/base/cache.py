@@ -0,0 +1,361 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import os
+import sqlite3
+import threading
+import time
+
+from plasticity.base.transport import RawResponse
+
+
+class Cache(object):
+    """A Cache stores raw API responses by a canonical request key.
+
+    Entries hold only the raw response bytes, so every hit is rebuilt into a
+    brand new `Response` by the `Endpoint` and callers never share mutable
+    state. Subclasses implement `_get`, `_set` and `clear`.
+
+    Attributes:
+        replay_only: Whether a cache miss raises instead of calling the API
+        hits: The number of lookups answered from the cache
+        misses: The number of lookups not found in the cache
+        evictions: The number of entries evicted to respect the limits
+    """
+
+    def __init__(self, replay_only=False):
+        """Initializes a new Cache.
+
+        :param replay_only: Never call the API; a cache miss raises a
+                            `PlasticityCacheMissError`, defaults to False
+        :type replay_only: bool, optional
+        """
+        self.replay_only = replay_only
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._counter_lock = threading.Lock()
+
+    def get(self, key):
+        """Gets a cached response.
+
+        :param key: The canonical request key
+        :type key: str
+        :returns: A fresh `RawResponse` or `None` if the key isn't cached
+        :rtype: {RawResponse|None}
+        """
+        entry = self._get(key)
+        with self._counter_lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        status_code, content, body = entry
+        return RawResponse(status_code, content, body=body)
+
+    def set(self, key, response):
+        """Caches a response.
+
+        :param key: The canonical request key
+        :type key: str
+        :param response: The HTTP response to cache
+        :type response: requests.Response|RawResponse
+        """
+        body = response.request.body
+        if 'content-encoding' in getattr(response.request, 'headers', {}):
+            # A compressed request body can't be stored as text
+            body = None
+        self._set(key, (response.status_code, response.content, body))
+
+    def stats(self):
+        """Gets the cache counters.
+
+        :returns: The hits, misses and evictions of the cache
+        :rtype: {dict}
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, entry):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    @staticmethod
+    def entry_size(entry):
+        """The approximate size in bytes of a cache entry."""
+        return len(entry[1] or b'') + len(entry[2] or b'')
+
+
+class MemoryCache(Cache):
+    """An in-process LRU cache of API responses with an optional TTL.
+
+    ```python
+    plasticity = Plasticity(cache=MemoryCache(max_entries=10000))
+    ```
+
+    Attributes:
+        max_entries: The max number of responses held
+        max_bytes: The max total size of the responses held, or `None`
+        ttl: The number of seconds a response stays fresh, or `None`
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024,
+                 ttl=None, replay_only=False):
+        """Initializes a new MemoryCache.
+
+        :param max_entries: The max number of responses held,
+                            defaults to 1024
+        :type max_entries: int, optional
+        :param max_bytes: The max total size of the responses held in bytes,
+                          defaults to 64 MiB
+        :type max_bytes: int, optional
+        :param ttl: The number of seconds a response stays fresh,
+                    defaults to None (forever)
+        :type ttl: number, optional
+        :param replay_only: Never call the API, defaults to False
+        :type replay_only: bool, optional
+        """
+        super(MemoryCache, self).__init__(replay_only=replay_only)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires is not None and expires < time.time():
+                self._pop(key)
+                return None
+            del self._entries[key]
+            self._entries[key] = item
+            return entry
+
+    def _set(self, key, entry):
+        size = self.entry_size(entry)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (expires, entry)
+            self.size += size
+            while (len(self._entries) > self.max_entries or
+                   (self.max_bytes is not None and
+                    self.size > self.max_bytes)):
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _pop(self, key):
+        _, entry = self._entries.pop(key)
+        self.size -= self.entry_size(entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class DiskCache(Cache):
+    """A persistent, size-bounded cache of API responses in SQLite.
+
+    The cache survives restarts and can be shared by any number of threads
+    and worker processes pointing at the same file. Entries are evicted in
+    least-recently-used order once `max_bytes` or `max_entries` is
+    exceeded. Pass `replay_only=True` to re-process a corpus strictly from
+    the cache without ever touching the network.
+
+    A hit only reads the database. The time each entry was last used is
+    kept in memory and written in one batch every `access_interval`
+    seconds (and before evicting), so readers in many processes don't
+    queue on SQLite's single write lock. A `replay_only` cache never
+    writes it at all.
+
+    ```python
+    plasticity = Plasticity(cache=DiskCache('responses.sqlite'))
+    ```
+
+    Attributes:
+        path: The path of the SQLite database
+        max_entries: The max number of responses held, or `None`
+        max_bytes: The max total size of the responses held, or `None`
+        access_interval: The seconds between writes of the access times
+    """
+
+    def __init__(self, path, max_entries=None, max_bytes=None,
+                 replay_only=False, timeout=30.0, access_interval=5.0):
+        """Initializes a new DiskCache.
+
+        :param path: The path of the SQLite database (created if missing)
+        :type path: str
+        :param max_entries: The max number of responses held,
+                            defaults to None (unbounded)
+        :type max_entries: int, optional
+        :param max_bytes: The max total size of the responses held in bytes,
+                          defaults to None (unbounded)
+        :type max_bytes: int, optional
+        :param replay_only: Never call the API, defaults to False
+        :type replay_only: bool, optional
+        :param timeout: The seconds to wait on a database locked by another
+                        process, defaults to 30
+        :type timeout: number, optional
+        :param access_interval: The seconds between writes of the times the
+                                entries were last used, defaults to 5
+        :type access_interval: number, optional
+        """
+        super(DiskCache, self).__init__(replay_only=replay_only)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.access_interval = access_interval
+        self._local = threading.local()
+        # The access times not yet written, by key
+        self._accessed = {}
+        self._accessed_lock = threading.Lock()
+        self._accessed_flushed = time.time()
+        with self._connection as db:
+            db.execute('CREATE TABLE IF NOT EXISTS responses ('
+                       'key TEXT PRIMARY KEY, status INTEGER, content BLOB, '
+                       'body TEXT, size INTEGER, accessed REAL)')
+            db.execute('CREATE INDEX IF NOT EXISTS responses_accessed '
+                       'ON responses (accessed)')
+            # Running totals, so the limits can be checked without a scan
+            db.execute('CREATE TABLE IF NOT EXISTS totals ('
+                       'id INTEGER PRIMARY KEY CHECK (id = 0), '
+                       'count INTEGER, size INTEGER)')
+            db.execute('INSERT OR IGNORE INTO totals VALUES (0, 0, 0)')
+            db.execute('CREATE TRIGGER IF NOT EXISTS responses_insert '
+                       'AFTER INSERT ON responses BEGIN UPDATE totals SET '
+                       'count = count + 1, size = size + NEW.size; END')
+            db.execute('CREATE TRIGGER IF NOT EXISTS responses_delete '
+                       'AFTER DELETE ON responses BEGIN UPDATE totals SET '
+                       'count = count - 1, size = size - OLD.size; END')
+
+    @property
+    def _connection(self):
+        """A SQLite connection for the current thread and process."""
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            db = sqlite3.connect(self.path, timeout=self.timeout)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            # Makes INSERT OR REPLACE fire the delete trigger
+            db.execute('PRAGMA recursive_triggers=ON')
+            self._local.connection = db
+            self._local.pid = pid
+        return self._local.connection
+
+    def _totals(self, db):
+        return db.execute('SELECT count, size FROM totals').fetchone()
+
+    def __len__(self):
+        return self._totals(self._connection)[0]
+
+    @property
+    def size(self):
+        """The total size in bytes of the responses held."""
+        return self._totals(self._connection)[1]
+
+    def _get(self, key):
+        db = self._connection
+        row = db.execute(
+            'SELECT status, content, body FROM responses WHERE key = ?',
+            (key,)).fetchone()
+        if row is None:
+            return None
+        if not self.replay_only:
+            now = time.time()
+            with self._accessed_lock:
+                self._accessed[key] = now
+                flush = now - self._accessed_flushed >= self.access_interval
+            if flush:
+                with db:
+                    self._flush_accessed(db)
+        status_code, content, body = row
+        return status_code, bytes(content), body
+
+    def _flush_accessed(self, db):
+        """Writes the pending access times in the current transaction."""
+        with self._accessed_lock:
+            accessed, self._accessed = self._accessed, {}
+            self._accessed_flushed = time.time()
+        if accessed:
+            db.executemany(
+                'UPDATE responses SET accessed = ? WHERE key = ?',
+                [(t, key) for key, t in accessed.items()])
+
+    def _set(self, key, entry):
+        status_code, content, body = entry
+        size = self.entry_size(entry)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        if isinstance(body, bytes):
+            body = body.decode('utf-8')
+        with self._connection as db:
+            db.execute('INSERT OR REPLACE INTO responses '
+                       '(key, status, content, body, size, accessed) '
+                       'VALUES (?, ?, ?, ?, ?, ?)',
+                       (key, status_code, sqlite3.Binary(content), body,
+                        size, time.time()))
+            if self.max_entries is not None or self.max_bytes is not None:
+                # Brings the LRU order up to date before evicting
+                self._flush_accessed(db)
+            self._evict(db)
+
+    def _evict(self, db):
+        """Deletes least-recently-used entries until within the limits."""
+        count, size = self._totals(db)
+        if self.max_entries is not None and count > self.max_entries:
+            self._delete_oldest(db, count - self.max_entries)
+            size = self._totals(db)[1]
+        if self.max_bytes is not None and size > self.max_bytes:
+            excess, count = size - self.max_bytes, 0
+            for (entry_size,) in db.execute(
+                    'SELECT size FROM responses ORDER BY accessed'):
+                excess -= entry_size
+                count += 1
+                if excess <= 0:
+                    break
+            self._delete_oldest(db, count)
+
+    def _delete_oldest(self, db, count):
+        db.execute('DELETE FROM responses WHERE key IN (SELECT key FROM '
+                   'responses ORDER BY accessed LIMIT ?)', (count,))
+        with self._counter_lock:
+            self.evictions += count
+
+    def clear(self):
+        with self._connection as db:
+            db.execute('DELETE FROM responses')
+
+    def close(self):
+        """Writes the pending access times and closes this thread's
+        connection to the database.
+        """
+        if self._accessed:
+            with self._connection as db:
+                self._flush_accessed(db)
+        if getattr(self._local, 'pid', None) == os.getpid():
+            self._local.connection.close()
+            del self._local.connection
+            del self._local.pid
@@ -3,9 +3,15 @@ from __future__ import division
 from __future__ import print_function
 
 import json
+import hashlib
+import collections
 import requests
+from concurrent import futures
 
+from plasticity.base.observer import RequestEvent, timer
 from plasticity.utils import utils
+from plasticity.utils.compression import get_accept_encoding
+from plasticity.utils.codec import default_codec
 
 
 class Endpoint(object):
@@ -20,6 +26,7 @@ class Endpoint(object):
         self.plasticity = plasticity
         self.headers = {}
         self.headers['content-type'] = 'application/json'
+        self.headers['accept-encoding'] = get_accept_encoding()
         if self.plasticity.token:
             self.headers['authorization'] = 'Bearer ' + self.plasticity.token
 
@@ -43,15 +50,153 @@ class Endpoint(object):
             data.update(kwargs)
         return data
 
+    @classmethod
+    def get_batch_payload(cls, args, kwargs, **options):
+        """Gets the payload of one request of a batch (see `post_many()`).
+
+        Endpoints with batch `options` override this to apply them.
+        """
+        return cls.get_payload_from_args(args, kwargs)
+
+    @classmethod
+    def get_canonical_payload(cls, payload):
+        """Fills in the `PARAMS` defaults missing from a payload."""
+        canonical = dict(p for p in cls.PARAMS if len(p) > 1)
+        canonical.update(payload)
+        return canonical
+
+    def get_cache_key(self, method, payload):
+        """Gets a canonical hash of a request to this endpoint.
+
+        Two requests that the API would answer identically (e.g. one that
+        omits `pretty` and one that sets it to its default) share a key.
+        :param method: The HTTP method
+        :type method: str
+        :param payload: The request payload
+        :type payload: dict
+        :returns: The hex digest of the request
+        :rtype: {str}
+        """
+        canonical = json.dumps(
+            [self.url, method, self.get_canonical_payload(payload)],
+            sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
     def _request(self, method, *args, **kwargs):
-        payload = self.get_payload_from_args(args, kwargs)
+        return self._request_payload(
+            method, self.get_payload_from_args(args, kwargs))
+
+    def _request_payload(self, method, payload, **options):
+        """Sends a payload and builds its `Response`.
+
+        Any `options` are passed on to the `Response` constructor, so they
+        are set before anything (e.g. an observer) can read the response.
+        """
+        if self.plasticity.observers:
+            return self._observed_request(method, payload, options)
+        key, response, cached = self._fetch(method, payload)
+        result = self._build_response(response, payload, **options)
+        if key is not None and not cached:
+            self._store(key, response, result)
+        return result
+
+    def _observed_request(self, method, payload, options):
+        """Sends a request, timing each phase for the observers."""
+        observers = self.plasticity.observers
+        event = RequestEvent(
+            self.url[len(self.plasticity.url):].strip('/'), method, payload)
+        timings = event.timings
+        for observer in observers:
+            observer.pre_request(event)
+        start = timer()
         try:
-            response = requests.request(
-                method, self.url, data=json.dumps(payload),
-                headers=self.headers)
+            key, response, event.cached = self._fetch(method, payload)
+            fetched = timer()
+            timings['network'] = fetched - start
+            elapsed = getattr(response, 'elapsed', None)
+            if elapsed is not None:
+                timings['first_byte'] = elapsed.total_seconds()
+            event.status_code = response.status_code
+            event.bytes_out = len(response.request.body or b'')
+            event.bytes_in = int(response.headers.get('content-length') or
+                                 len(response.content or b''))
+            decoded = self.Response.decode(
+                response.content, self.plasticity.codec)
+            decoded_at = timer()
+            timings['decode'] = decoded_at - fetched
+            result = self._build_response(
+                response, payload, decoded=decoded, **options)
+            timings['build'] = timer() - decoded_at
+            if key is not None and not event.cached:
+                self._store(key, response, result)
+        except Exception as e:
+            timings['total'] = timer() - start
+            event.exception = e
+            for observer in observers:
+                observer.on_error(event)
+            raise
+        timings['total'] = timer() - start
+        event.result = result
+        for observer in observers:
+            observer.post_response(event)
+        return result
+
+    def _fetch(self, method, payload):
+        """Gets the raw response to a payload from the cache or the API.
+
+        :returns: The cache key (or `None` if there is no cache or
+                  coalescing), the raw response and whether it was cached
+        :rtype: {tuple}
+        """
+        cache = self.plasticity.cache
+        single_flight = self.plasticity.single_flight
+        if cache is None and single_flight is None:
+            return None, self._send(method, payload), False
+
+        key = self.get_cache_key(method, payload)
+        if cache is not None:
+            response = cache.get(key)
+            if response is not None:
+                return key, response, True
+            if cache.replay_only:
+                raise self.PlasticityCacheMissError(
+                    'The request is not cached and the cache is replay only.')
+        if single_flight is not None:
+            # Identical requests in flight share one raw response, but each
+            # caller still parses its own `Response` from it
+            response = single_flight.do(
+                key, lambda: self._send(method, payload))
+        else:
+            response = self._send(method, payload)
+        return key, response, False
+
+    def _store(self, key, response, result):
+        """Caches a raw response from the API, unless it is an error."""
+        cache = self.plasticity.cache
+        if cache is not None and not result.error:
+            cache.set(key, response)
+
+    def _send(self, method, payload):
+        """Sends a payload to the API over the shared transport."""
+        data = self.plasticity.codec.dumps(payload)
+        headers = self.headers
+        compressor = self.plasticity.compressor
+        if (compressor is not None and
+                len(data) >= self.plasticity.compress_min_size):
+            data = compressor.compress(data)
+            headers = dict(headers)
+            headers['content-encoding'] = compressor.name
+        try:
+            return self.plasticity.transport.request(
+                method, self.url, data=data, headers=headers)
         except requests.exceptions.Timeout:
             raise self.PlasticityAPITimeoutError('The request timed out.')
-        return self.Response(response)
+
+    def _build_response(self, response, payload, decoded=None, **options):
+        """Builds this endpoint's `Response` for a raw HTTP response."""
+        return self.Response(
+            response, request=payload, codec=self.plasticity.codec,
+            decoded=decoded, **options)
 
     def post(self, *args, **kwargs):
         return self._request('POST', *args, **kwargs)
@@ -62,6 +207,85 @@ class Endpoint(object):
     def delete(self, *args, **kwargs):
         return self._request('DELETE', *args, **kwargs)
 
+    def post_many(self, payloads, workers=None, as_completed=False,
+                  **kwargs):
+        """Sends a batch of POST requests on a pool of worker threads.
+
+        Each payload may be a dict, a tuple of positional arguments, or a
+        single positional argument (e.g. the text for Core), exactly as
+        accepted by `post()`. Any keyword arguments are applied to every
+        payload that is not a dict.
+
+        Only a bounded number of payloads are read ahead of the results
+        being consumed, so `payloads` may be a very large (or infinite)
+        iterator.
+
+        A payload that fails with an exception does not abort the batch;
+        a `BatchError` is yielded in its place instead.
+        :param payloads: The payloads to send
+        :type payloads: iterable
+        :param workers: The number of concurrent requests, defaults to the
+                        transport's `pool_maxsize`
+        :type workers: int, optional
+        :param as_completed: Yield responses as they complete instead of in
+                             input order, defaults to False
+        :type as_completed: bool, optional
+        :returns: A `Response` (or `BatchError`) for each payload
+        :rtype: {generator}
+        """
+        return self._request_many(
+            'POST', payloads, workers, as_completed, kwargs)
+
+    def _request_many(self, method, payloads, workers, as_completed,
+                      kwargs, **options):
+        workers = workers or self.plasticity.transport.pool_maxsize
+        window = workers * 2
+        executor = futures.ThreadPoolExecutor(max_workers=workers)
+        pending = collections.deque() if not as_completed else set()
+        payloads = iter(payloads)
+
+        def submit():
+            for index, payload in enumerate(payloads):
+                args = payload if isinstance(payload, tuple) else (payload,)
+                yield executor.submit(
+                    self._request_one, method, index, args, kwargs,
+                    **options)
+
+        try:
+            for future in submit():
+                if as_completed:
+                    pending.add(future)
+                else:
+                    pending.append(future)
+                if len(pending) < window:
+                    continue
+                if as_completed:
+                    done, pending = futures.wait(
+                        pending, return_when=futures.FIRST_COMPLETED)
+                    for f in done:
+                        yield f.result()
+                else:
+                    yield pending.popleft().result()
+            if as_completed:
+                for f in futures.as_completed(pending):
+                    yield f.result()
+            else:
+                while pending:
+                    yield pending.popleft().result()
+        finally:
+            for f in pending:
+                f.cancel()
+            executor.shutdown(wait=False)
+
+    def _request_one(self, method, index, args, kwargs, **options):
+        """Sends one request of a batch, capturing any exception."""
+        payload = None
+        try:
+            payload = self.get_batch_payload(args, kwargs, **options)
+            return self._request_payload(method, payload, **options)
+        except Exception as e:
+            return self.BatchError(index, payload, e)
+
     class Response(object):
         """A Response is a specific API response to an API endpoint.
 
@@ -69,22 +293,56 @@ class Endpoint(object):
             plasticity: a Plasticity instance with the API URL and token
         """
 
-        def __init__(self, response):
+        def __init__(self, response, request=None, codec=None,
+                     decoded=None):
+            """Initializes a new Response.
+
+            :param response: The HTTP response
+            :type response: requests.Response|RawResponse
+            :param request: The payload that was sent, defaults to decoding
+                            the body of the HTTP request
+            :type request: dict, optional
+            :param codec: The JSON codec to decode with, defaults to the
+                          fastest one installed
+            :type codec: JSONCodec, optional
+            :param decoded: The already decoded response body, defaults to
+                            decoding the body of `response`
+            :type decoded: dict, optional
+            """
             self._response = response
             self._request = response.request
+            codec = codec or default_codec
 
-            try:
-                self.response = json.loads(response.text)
-            except ValueError:
-                self.response = json.loads(
-                    response.text[:response.text.rfind('<!DOCTYPE')])
-            self.request = json.loads(self._request.body)
+            if decoded is None:
+                decoded = getattr(response, 'decoded', None)
+            if decoded is None:
+                decoded = self.decode(response.content, codec)
+            self.response = decoded
+            if request is None:
+                request = codec.loads(self._request.body)
+            self.request = request
 
             self.data = self.response.get('data')
             self.error = self.response.get('error', False)
             self.error_code = self.response.get('errorCode', 200)
             self.error_message = self.response.get('message', '')
 
+        @staticmethod
+        def decode(content, codec):
+            """Decodes the JSON body of an API response.
+
+            :param content: The raw response body
+            :type content: bytes
+            :param codec: The JSON codec to decode with
+            :type codec: JSONCodec
+            :returns: The decoded response
+            :rtype: {dict}
+            """
+            try:
+                return codec.loads(content)
+            except ValueError:
+                return codec.loads(content[:content.rfind(b'<!DOCTYPE')])
+
         def __repr__(self):
             return '<Response {}>'.format(id(self))
 
@@ -99,6 +357,42 @@ class Endpoint(object):
                 output = '<Response {}>'.format(self.response)
             return output
 
+    class BatchError(object):
+        """A BatchError stands in for the `Response` of a batch payload
+        whose request raised an exception.
+
+        It mirrors the error attributes of a `Response`, so batch results
+        can be checked uniformly with `result.error`.
+
+        Attributes:
+            index: The position of the payload in the batch
+            request: The payload that was sent
+            exception: The exception that was raised
+        """
+
+        def __init__(self, index, request, exception):
+            self.index = index
+            self.request = request
+            self.exception = exception
+            self.data = None
+            self.error = True
+            self.error_code = None
+            self.error_message = '{}'.format(exception)
+
+        def __repr__(self):
+            return '<BatchError {}>'.format(id(self))
+
+        def __str__(self):
+            output = 'BatchError - payload {}:'.format(self.index)
+            output += '\n'
+            output += utils.indent(utils.shorten('{}: {}'.format(
+                type(self.exception).__name__, self.error_message)))
+            return output
+
     class PlasticityAPITimeoutError(Exception):
         """Raised when the API connection has timed out."""
         pass
+
+    class PlasticityCacheMissError(Exception):
+        """Raised when a replay only cache doesn't hold a request."""
+        pass
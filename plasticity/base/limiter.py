@@ -0,0 +1,193 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import time
+
+clock = getattr(time, 'monotonic', time.time)
+
+
+class RateLimiter(object):
+    """A token bucket limiting the rate of requests sent to the API.
+
+    One RateLimiter is shared by every endpoint (and every thread) of a
+    `Plasticity` instance, so the rate holds for the API key as a whole.
+    Up to `burst` requests can go out at once after a quiet period.
+
+    ```python
+    plasticity = Plasticity(rate_limit=RateLimiter(50, burst=10))
+    ```
+
+    Attributes:
+        rate: The number of requests allowed per second
+        burst: The max number of requests allowed at once
+        waiting: The number of requests waiting for a token
+    """
+
+    def __init__(self, rate, burst=None):
+        """Initializes a new RateLimiter.
+
+        :param rate: The number of requests allowed per second
+        :type rate: number
+        :param burst: The max number of requests allowed at once,
+                      defaults to `rate` (and at least 1)
+        :type burst: number, optional
+        """
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self.waiting = 0
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Blocks until a request is allowed."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            self.waiting += 1
+        try:
+            while True:
+                with self._lock:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def stats(self):
+        """Gets the state of the limiter.
+
+        :returns: The rate, the tokens available and the requests waiting
+        :rtype: {dict}
+        """
+        with self._lock:
+            self._refill()
+            return {
+                'rate': self.rate,
+                'tokens': self._tokens,
+                'waiting': self.waiting,
+            }
+
+
+class AdaptiveConcurrency(object):
+    """An AIMD (additive increase, multiplicative decrease) limit on the
+    number of requests in flight.
+
+    Every healthy response grows the limit by `1 / limit`, i.e. by about
+    one for each full window of requests. A response that signals overload
+    (a 429 or 503 status, a connection error, a timeout, or a latency over
+    `max_latency`) multiplies the limit by `backoff`. Only one decrease
+    happens per window: requests already in flight when the limit was cut
+    don't cut it again.
+
+    ```python
+    plasticity = Plasticity(concurrency=AdaptiveConcurrency(max_limit=32))
+    ```
+
+    Attributes:
+        min_limit: The lowest the limit can go
+        max_limit: The highest the limit can go
+        backoff: The factor the limit is multiplied by on overload
+        max_latency: The latency in seconds over which a response signals
+                     overload, or `None`
+        in_flight: The number of requests in flight
+        waiting: The number of requests waiting for a slot (the queue depth)
+    """
+
+    def __init__(self, initial=10, min_limit=1, max_limit=100, backoff=0.5,
+                 max_latency=None):
+        """Initializes a new AdaptiveConcurrency.
+
+        :param initial: The initial limit, defaults to 10
+        :type initial: int, optional
+        :param min_limit: The lowest the limit can go, defaults to 1
+        :type min_limit: int, optional
+        :param max_limit: The highest the limit can go, defaults to 100
+        :type max_limit: int, optional
+        :param backoff: The factor the limit is multiplied by on overload,
+                        defaults to 0.5
+        :type backoff: float, optional
+        :param max_latency: The latency in seconds over which a response
+                            signals overload, defaults to None
+        :type max_latency: number, optional
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.max_latency = max_latency
+        self.in_flight = 0
+        self.waiting = 0
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._decreased = float('-inf')
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """The current max number of requests in flight."""
+        return int(self._limit)
+
+    def acquire(self):
+        """Blocks until a request may be sent.
+
+        :returns: The start time to pass to `release`
+        :rtype: {float}
+        """
+        with self._condition:
+            self.waiting += 1
+            while self.in_flight >= int(self._limit):
+                self._condition.wait()
+            self.waiting -= 1
+            self.in_flight += 1
+        return clock()
+
+    def release(self, start, overloaded=None):
+        """Ends a request and adjusts the limit from its outcome.
+
+        :param start: The time returned by `acquire`
+        :type start: float
+        :param overloaded: Whether the request signalled overload, defaults
+                           to None (no signal; the limit is left alone)
+        :type overloaded: bool, optional
+        """
+        now = clock()
+        if (overloaded is False and self.max_latency is not None and
+                now - start > self.max_latency):
+            overloaded = True
+        with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                if start >= self._decreased:
+                    self._limit = max(
+                        self.min_limit, self._limit * self.backoff)
+                    self._decreased = now
+            elif overloaded is False:
+                self._limit = min(
+                    self.max_limit, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def stats(self):
+        """Gets the state of the controller.
+
+        :returns: The limit, the requests in flight and the queue depth
+        :rtype: {dict}
+        """
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+            }
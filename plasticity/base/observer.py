@@ -0,0 +1,272 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import bisect
+import collections
+import threading
+import time
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class RequestEvent(object):
+    """A RequestEvent describes one request to an `Endpoint` as it is
+    handed to each `Observer`.
+
+    The `timings` are in seconds. `network` covers getting the raw response
+    (from the cache, or from the API including any retries), `first_byte`
+    the time until the API's response headers arrived, `decode` the JSON
+    decoding, `build` the construction of the `Response` object and `total`
+    the whole request. Phases that didn't happen (e.g. `decode` after a
+    timeout) are missing.
+
+    Attributes:
+        endpoint: The path of the endpoint (e.g. 'sapien/core')
+        method: The HTTP method
+        payload: The request payload
+        timings: The seconds spent in each phase of the request
+        cached: Whether the response came from the cache
+        status_code: The HTTP status code, or `None`
+        bytes_out: The size of the request body, or `None`
+        bytes_in: The size of the response body, or `None`
+        result: The `Response`, once it is built
+        exception: The exception raised by the request, if any
+    """
+
+    __slots__ = ('endpoint', 'method', 'payload', 'timings', 'cached',
+                 'status_code', 'bytes_out', 'bytes_in', 'result',
+                 'exception')
+
+    def __init__(self, endpoint, method, payload):
+        self.endpoint = endpoint
+        self.method = method
+        self.payload = payload
+        self.timings = {}
+        self.cached = False
+        self.status_code = None
+        self.bytes_out = None
+        self.bytes_in = None
+        self.result = None
+        self.exception = None
+
+    @property
+    def error(self):
+        """Whether the request raised or the API answered with an error."""
+        return self.exception is not None or bool(
+            self.result is not None and self.result.error)
+
+    def __repr__(self):
+        return '<RequestEvent {} {}>'.format(self.method, self.endpoint)
+
+
+class Observer(object):
+    """An Observer is notified of every request sent by the endpoints of a
+    `Plasticity` instance it is registered with.
+
+    Subclasses override any of the callbacks, which run on the thread that
+    made the request and receive its `RequestEvent`.
+
+    ```python
+    plasticity = Plasticity(observers=[MyObserver()])
+    ```
+    """
+
+    def pre_request(self, event):
+        """Called before a request is sent."""
+        pass
+
+    def post_response(self, event):
+        """Called once a request has a `Response` (which may be an API
+        error)."""
+        pass
+
+    def on_error(self, event):
+        """Called when a request raises an exception."""
+        pass
+
+
+class Histogram(object):
+    """A Histogram counts observed values in fixed buckets.
+
+    Attributes:
+        bounds: The upper bounds of the buckets (the last one is infinite)
+        counts: The number of values in each bucket
+        count: The number of values observed
+        sum: The sum of the values observed
+    """
+
+    BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+              2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, bounds=BOUNDS):
+        self.bounds = tuple(bounds) + (float('inf'),)
+        self.counts = [0] * len(self.bounds)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimates a quantile by interpolating within its bucket.
+
+        :param q: The quantile, between 0 and 1
+        :type q: float
+        :returns: The estimated value, or `None` if nothing was observed
+        :rtype: {float|None}
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i]
+                if upper == float('inf'):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-2]
+
+
+class EndpointMetrics(object):
+    """The metrics of the requests to one endpoint."""
+
+    PHASES = ('total', 'network', 'first_byte', 'decode', 'build')
+
+    def __init__(self, bounds):
+        self.requests = 0
+        self.errors = 0
+        self.cached = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency = dict((phase, Histogram(bounds))
+                            for phase in self.PHASES)
+
+    def record(self, event):
+        self.requests += 1
+        self.errors += event.error
+        self.cached += event.cached
+        self.bytes_out += event.bytes_out or 0
+        self.bytes_in += event.bytes_in or 0
+        for phase, seconds in event.timings.items():
+            self.latency[phase].observe(seconds)
+
+
+class Metrics(Observer):
+    """A Metrics observer collects per-endpoint request counts, error
+    counts, bytes sent and received and latency histograms of each phase.
+
+    ```python
+    metrics = Metrics()
+    plasticity = Plasticity(observers=[metrics])
+    ...
+    print(metrics.snapshot()['sapien/core']['latency']['total']['p99'])
+    print(metrics.to_prometheus())
+    ```
+    """
+
+    def __init__(self, bounds=Histogram.BOUNDS):
+        """Initializes a new Metrics.
+
+        :param bounds: The upper bounds of the latency histogram buckets in
+                       seconds, defaults to 1ms up to 60s
+        :type bounds: tuple, optional
+        """
+        self.bounds = bounds
+        self._endpoints = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _record(self, event):
+        with self._lock:
+            metrics = self._endpoints.get(event.endpoint)
+            if metrics is None:
+                metrics = self._endpoints[event.endpoint] = \
+                    EndpointMetrics(self.bounds)
+            metrics.record(event)
+
+    post_response = _record
+    on_error = _record
+
+    def reset(self):
+        """Forgets every metric collected so far."""
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self):
+        """Gets a summary of the metrics collected so far.
+
+        :returns: The metrics of each endpoint by its path
+        :rtype: {dict}
+        """
+        snapshot = {}
+        with self._lock:
+            for endpoint, metrics in self._endpoints.items():
+                latency = {}
+                for phase, histogram in metrics.latency.items():
+                    if not histogram.count:
+                        continue
+                    latency[phase] = {
+                        'count': histogram.count,
+                        'mean': histogram.sum / histogram.count,
+                        'p50': histogram.quantile(0.5),
+                        'p90': histogram.quantile(0.9),
+                        'p99': histogram.quantile(0.99),
+                    }
+                snapshot[endpoint] = {
+                    'requests': metrics.requests,
+                    'errors': metrics.errors,
+                    'cached': metrics.cached,
+                    'bytes_out': metrics.bytes_out,
+                    'bytes_in': metrics.bytes_in,
+                    'latency': latency,
+                }
+        return snapshot
+
+    def to_prometheus(self, prefix='plasticity'):
+        """Renders the metrics in the Prometheus text exposition format.
+
+        :param prefix: The prefix of every metric name, defaults to
+                       'plasticity'
+        :type prefix: str, optional
+        :returns: The metrics, one sample per line
+        :rtype: {str}
+        """
+        lines = []
+        counters = (('requests_total', 'requests'),
+                    ('errors_total', 'errors'),
+                    ('cached_total', 'cached'),
+                    ('sent_bytes_total', 'bytes_out'),
+                    ('received_bytes_total', 'bytes_in'))
+        with self._lock:
+            endpoints = list(self._endpoints.items())
+            for name, attribute in counters:
+                lines.append('# TYPE {}_{} counter'.format(prefix, name))
+                for endpoint, metrics in endpoints:
+                    lines.append('{}_{}{{endpoint="{}"}} {}'.format(
+                        prefix, name, endpoint, getattr(metrics, attribute)))
+            lines.append('# TYPE {}_request_seconds histogram'.format(prefix))
+            for endpoint, metrics in endpoints:
+                for phase in EndpointMetrics.PHASES:
+                    histogram = metrics.latency[phase]
+                    if not histogram.count:
+                        continue
+                    labels = 'endpoint="{}",phase="{}"'.format(endpoint, phase)
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds,
+                                            histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            '{}_request_seconds_bucket{{{},le="{}"}} {}'
+                            .format(prefix, labels,
+                                    '+Inf' if bound == float('inf')
+                                    else repr(bound), cumulative))
+                    lines.append('{}_request_seconds_sum{{{}}} {!r}'.format(
+                        prefix, labels, histogram.sum))
+                    lines.append('{}_request_seconds_count{{{}}} {}'.format(
+                        prefix, labels, histogram.count))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,167 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import email.utils
+import random
+import threading
+import time
+
+
+class Retry(object):
+    """A Retry decides whether, and after how long, a failed request is
+    sent again.
+
+    Requests that fail with a connection error, a timeout or one of the
+    `status_forcelist` status codes are retried up to `total` times. The
+    wait before each retry grows exponentially with full jitter, so many
+    clients failing at once don't retry in lockstep. A `Retry-After`
+    header from the API is waited for instead when it's present, up to
+    `max_retry_after` seconds; a response asking for a longer wait is
+    returned without being retried.
+
+    Retries are also limited by a budget shared by every request: each
+    request adds `budget_ratio` to it and each retry takes 1 from it, up
+    to a balance of `budget`. When the API is down, the budget runs dry
+    and failures surface quickly instead of multiplying the load.
+
+    Attributes:
+        total: The max number of retries of a single request
+        backoff_factor: The base wait in seconds, doubled on every retry
+        max_backoff: The longest backoff in seconds before a retry
+        max_retry_after: The longest `Retry-After` in seconds waited for
+        status_forcelist: The HTTP status codes that are retried
+        budget: The max number of retries banked in the budget
+        budget_ratio: The number of retries banked per request
+        retries: The number of retries made so far
+    """
+
+    STATUS_FORCELIST = (429, 500, 502, 503, 504)
+
+    def __init__(self, total=3, backoff_factor=0.5, max_backoff=30.0,
+                 status_forcelist=STATUS_FORCELIST, budget=10,
+                 budget_ratio=0.2, max_retry_after=120.0):
+        """Initializes a new Retry.
+
+        :param total: The max number of retries of a single request,
+                      defaults to 3
+        :type total: int, optional
+        :param backoff_factor: The base wait in seconds, defaults to 0.5
+        :type backoff_factor: number, optional
+        :param max_backoff: The longest backoff in seconds before a
+                            retry, defaults to 30
+        :type max_backoff: number, optional
+        :param status_forcelist: The HTTP status codes that are retried,
+                                 defaults to 429 and 5xx gateway errors
+        :type status_forcelist: tuple, optional
+        :param budget: The max number of retries banked, defaults to 10
+        :type budget: number, optional
+        :param budget_ratio: The number of retries banked per request,
+                             defaults to 0.2
+        :type budget_ratio: number, optional
+        :param max_retry_after: The longest `Retry-After` in seconds waited
+                                for; a response asking for longer isn't
+                                retried, defaults to 120
+        :type max_retry_after: number, optional
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_forcelist = frozenset(status_forcelist)
+        self.budget = budget
+        self.budget_ratio = budget_ratio
+        self.max_retry_after = max_retry_after
+        self.retries = 0
+        self._balance = float(budget)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """Banks `budget_ratio` retries for a new request."""
+        with self._lock:
+            self._balance = min(self._balance + self.budget_ratio,
+                                self.budget)
+
+    def withdraw(self):
+        """Takes a retry from the budget.
+
+        :returns: Whether the budget allowed the retry
+        :rtype: {bool}
+        """
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            self.retries += 1
+            return True
+
+    def is_retryable(self, response):
+        """Whether a response has a status code that should be retried."""
+        return response.status_code in self.status_forcelist
+
+    def get_backoff(self, attempt):
+        """Gets the jittered wait in seconds before the given retry.
+
+        :param attempt: The number of the retry, starting at 0
+        :type attempt: int
+        :returns: The wait in seconds
+        :rtype: {float}
+        """
+        cap = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    @staticmethod
+    def get_retry_after(response):
+        """Parses the `Retry-After` header of a response.
+
+        :param response: The HTTP response
+        :type response: requests.Response
+        :returns: The wait in seconds, or `None` if there is no valid header
+        :rtype: {float|None}
+        """
+        value = response.headers.get('retry-after')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        date = email.utils.parsedate_tz(value)
+        if date is None:
+            return None
+        return max(0.0, email.utils.mktime_tz(date) - time.time())
+
+    def get_wait(self, attempt, response=None):
+        """Gets the wait before a retry, or `None` if it shouldn't happen.
+
+        :param attempt: The number of the retry, starting at 0
+        :type attempt: int
+        :param response: The failed response, defaults to None (for a
+                         connection error or timeout)
+        :type response: requests.Response, optional
+        :returns: The wait in seconds, or `None` to stop retrying
+        :rtype: {float|None}
+        """
+        if attempt >= self.total:
+            return None
+        if response is not None:
+            retry_after = self.get_retry_after(response)
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                return retry_after
+        return self.get_backoff(attempt)
+
+    def stats(self):
+        """Gets the retry counters.
+
+        :returns: The retries made and the retries left in the budget
+        :rtype: {dict}
+        """
+        return {'retries': self.retries, 'budget': self._balance}
+
+    @classmethod
+    def from_value(cls, retries):
+        """Builds a Retry from a number of retries, a Retry or `None`."""
+        if retries is None or isinstance(retries, cls):
+            return retries
+        return cls(total=retries) if retries else None
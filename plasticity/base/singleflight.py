@@ -0,0 +1,80 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+
+
+class SingleFlight(object):
+    """A SingleFlight coalesces identical calls that are in flight at the
+    same time.
+
+    The first caller for a key runs the call; every other caller that asks
+    for the same key before it finishes waits and receives the same result
+    (or exception) instead of running the call again.
+
+    Attributes:
+        calls: The number of calls that were actually run
+        coalesced: The number of calls answered by another caller's result
+    """
+
+    def __init__(self):
+        """Initializes a new SingleFlight."""
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Runs `fn`, unless a call for `key` is already in flight.
+
+        :param key: The key identifying identical calls
+        :type key: str
+        :param fn: The call to run
+        :type fn: callable
+        :returns: The result of the call
+        :rtype: {any}
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is None:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """Gets the coalescing counters.
+
+        :returns: The calls run and the calls coalesced
+        :rtype: {dict}
+        """
+        return {'calls': self.calls, 'coalesced': self.coalesced}
+
+
+class _Call(object):
+    """A call in flight and, once it's done, its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
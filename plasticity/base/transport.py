@@ -0,0 +1,195 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Transport(object):
+    """A Transport sends the HTTP requests for every `Endpoint` created from
+    the same `Plasticity` instance.
+
+    It owns a single `requests.Session` so connections (and their TCP/TLS
+    handshakes) are kept alive and reused across calls. The session's
+    connection pool is thread-safe, so one `Transport` can be shared by
+    any number of worker threads.
+
+    Requests that fail transiently are retried according to `retry`. Every
+    attempt first waits on the optional `rate_limiter` and `concurrency`
+    limits, which are shared by all the threads using the transport.
+
+    Attributes:
+        pool_connections: The number of per-host connection pools to cache
+        pool_maxsize: The max number of connections kept alive per host
+        timeout: The (connect, read) timeouts in seconds
+        retry: The `Retry` policy, or `None` to never retry
+        rate_limiter: The `RateLimiter` of requests, or `None`
+        concurrency: The `AdaptiveConcurrency` limit of requests in flight,
+                     or `None`
+    """
+
+    RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError,
+                        requests.exceptions.Timeout)
+    OVERLOAD_STATUSES = frozenset([429, 503])
+
+    def __init__(self, pool_connections=10, pool_maxsize=10,
+                 timeout=None, retry=None, rate_limiter=None,
+                 concurrency=None):
+        """Initializes a new Transport.
+
+        :param pool_connections: The number of hosts to keep pools for,
+                                 defaults to 10
+        :type pool_connections: int, optional
+        :param pool_maxsize: The max number of connections kept alive per
+                             host, defaults to 10
+        :type pool_maxsize: int, optional
+        :param timeout: The (connect, read) timeouts in seconds, defaults
+                        to None (wait forever)
+        :type timeout: tuple, optional
+        :param retry: The retry policy, defaults to None (never retry)
+        :type retry: Retry, optional
+        :param rate_limiter: The request rate limit, defaults to None
+        :type rate_limiter: RateLimiter, optional
+        :param concurrency: The adaptive limit of requests in flight,
+                            defaults to None
+        :type concurrency: AdaptiveConcurrency, optional
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The shared `requests.Session`, created on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        """Builds a `requests.Session` with sized connection pools."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def request(self, method, url, data=None, headers=None):
+        """Sends an HTTP request over the pooled session, retrying it on
+        transient errors.
+
+        Once the retries run out, the last response is returned (or the
+        last exception is raised).
+
+        :param method: The HTTP method (e.g. 'POST')
+        :type method: str
+        :param url: The URL to request
+        :type url: str
+        :param data: The request body, defaults to None
+        :type data: str|bytes, optional
+        :param headers: The request headers, defaults to None
+        :type headers: dict, optional
+        :returns: The HTTP response
+        :rtype: {requests.Response}
+        """
+        retry = self.retry
+        if retry is None:
+            return self._send(method, url, data, headers)
+
+        retry.deposit()
+        attempt = 0
+        while True:
+            try:
+                response = self._send(method, url, data, headers)
+            except self.RETRY_EXCEPTIONS:
+                wait = retry.get_wait(attempt)
+                if wait is None or not retry.withdraw():
+                    raise
+            else:
+                if not retry.is_retryable(response):
+                    return response
+                wait = retry.get_wait(attempt, response)
+                if wait is None or not retry.withdraw():
+                    return response
+                # Reads the body so the connection goes back to the pool
+                response.content
+            time.sleep(wait)
+            attempt += 1
+
+    def _send(self, method, url, data, headers):
+        """Sends a single attempt of a request within the limits."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        concurrency = self.concurrency
+        if concurrency is None:
+            return self.session.request(
+                method, url, data=data, headers=headers, timeout=self.timeout)
+
+        start = concurrency.acquire()
+        overloaded = None
+        try:
+            response = self.session.request(
+                method, url, data=data, headers=headers, timeout=self.timeout)
+            overloaded = response.status_code in self.OVERLOAD_STATUSES
+            return response
+        except self.RETRY_EXCEPTIONS:
+            overloaded = True
+            raise
+        finally:
+            concurrency.release(start, overloaded)
+
+    def close(self):
+        """Closes the session and every pooled connection."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class RawResponse(object):
+    """A RawResponse is a minimal stand-in for a `requests.Response`.
+
+    It holds a response body that did not come from `requests` (e.g. from
+    the asyncio client) so it can be handed to any `Endpoint.Response`.
+
+    Attributes:
+        status_code: The HTTP status code
+        content: The raw response body
+        headers: The response headers
+        request: An object whose `body` is the raw request body
+        decoded: The already decoded response body, if there is one
+    """
+
+    def __init__(self, status_code, content, body=None, headers=None,
+                 encoding='utf-8', decoded=None):
+        """Initializes a new RawResponse."""
+        self.status_code = status_code
+        self.content = content
+        self.decoded = decoded
+        self.headers = headers or {}
+        self.encoding = encoding
+        self.request = RawRequest(body)
+
+    @property
+    def text(self):
+        """The response body decoded to text."""
+        return self.content.decode(self.encoding or 'utf-8', 'replace')
+
+
+class RawRequest(object):
+    """A RawRequest holds the body of the request behind a `RawResponse`."""
+
+    def __init__(self, body):
+        self.body = body
@@ -0,0 +1,290 @@
+"""Bulk-processes a file of inputs through a Plasticity API endpoint.
+
+Run `python -m plasticity --help` for usage. For example:
+
+```sh
+python -m plasticity core -i texts.jsonl -o results.jsonl \
+    --workers 16 --checkpoint results.ckpt -p ner=false
+```
+
+Each input line becomes one output line holding the `id` and line number
+of the input and either the API `response` or an `error`. The input is
+streamed with a bounded number of requests in flight, so memory use does
+not grow with the size of the input.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+from plasticity import Plasticity
+from plasticity.utils.utils import replace
+
+ENDPOINTS = ('core', 'names', 'transform')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m plasticity',
+        description='Streams a JSONL or TSV file through a Plasticity API '
+                    'endpoint, writing one JSON line per input line.')
+    parser.add_argument('endpoint', choices=ENDPOINTS,
+                        help='The Sapien endpoint to call.')
+    parser.add_argument('-i', '--input', default='-',
+                        help='The input file (default: stdin).')
+    parser.add_argument('-o', '--output', default='-',
+                        help='The output file (default: stdout).')
+    parser.add_argument('-f', '--format', choices=('jsonl', 'tsv'),
+                        help='The input format (default: from the input '
+                             'file extension, else jsonl). A JSONL line is '
+                             'an object of parameters, a list of positional '
+                             'parameters, or a single string. A TSV line '
+                             'holds positional parameters.')
+    parser.add_argument('-p', '--param', action='append', default=[],
+                        metavar='KEY=VALUE',
+                        help='A parameter sent with every input, e.g. '
+                             'ner=false (the value is parsed as JSON when '
+                             'possible). Can be repeated.')
+    parser.add_argument('--id-field', default='id',
+                        help='The JSONL field holding the ID of an input '
+                             '(default: id). Inputs without one are '
+                             'identified by their line number.')
+    parser.add_argument('-w', '--workers', type=int, default=8,
+                        help='The number of concurrent requests '
+                             '(default: 8).')
+    parser.add_argument('--unordered', action='store_true',
+                        help='Write results as they complete instead of in '
+                             'input order.')
+    parser.add_argument('--checkpoint',
+                        help='A file recording which input lines are '
+                             'done and how much output they fill. If it '
+                             'exists, the run drops any output written '
+                             'after it was saved, then resumes after those '
+                             'lines. Results written to stdout since the '
+                             'last save (every 5s) are written again.')
+    parser.add_argument('--progress', type=float, default=10.0,
+                        metavar='SECONDS',
+                        help='Report throughput to stderr this often '
+                             '(default: 10, 0 to disable).')
+    parser.add_argument('--token', help='The API token (default: the '
+                                        'PLASTICITY_API_KEY variable).')
+    parser.add_argument('--url', help='The API url.')
+    args = parser.parse_args(argv)
+    if args.format is None:
+        args.format = 'tsv' if args.input.endswith('.tsv') else 'jsonl'
+    return args
+
+
+def parse_params(params):
+    """Parses `KEY=VALUE` parameters, decoding JSON values when possible."""
+    parsed = {}
+    for param in params:
+        key, _, value = param.partition('=')
+        try:
+            parsed[key] = json.loads(value)
+        except ValueError:
+            parsed[key] = value
+    return parsed
+
+
+def read_inputs(lines, endpoint, fmt, params, id_field, skip=0):
+    """Parses input lines into (line number, ID, payload) tuples.
+
+    Blank lines are yielded with a payload of `None`.
+
+    :param lines: The input lines
+    :type lines: iterable
+    :param endpoint: The endpoint the payloads are for
+    :type endpoint: Endpoint
+    :param fmt: The input format ('jsonl' or 'tsv')
+    :type fmt: str
+    :param params: The parameters sent with every input
+    :type params: dict
+    :param id_field: The JSONL field holding the ID of an input
+    :type id_field: str
+    :param skip: The number of lines to skip, defaults to 0
+    :type skip: int, optional
+    :returns: The parsed inputs
+    :rtype: {generator}
+    """
+    for line_number, line in enumerate(lines):
+        if line_number < skip:
+            continue
+        line = line.rstrip('\r\n')
+        id_ = line_number
+        if not line.strip():
+            yield line_number, id_, None
+            continue
+        if fmt == 'tsv':
+            args = tuple(line.split('\t'))
+        else:
+            try:
+                value = json.loads(line)
+            except ValueError as e:
+                raise ValueError('Line {} is not valid JSON: {}'.format(
+                    line_number + 1, e))
+            if isinstance(value, dict):
+                id_ = value.pop(id_field, line_number)
+                value = dict(params, **value)
+                args = (value,)
+            elif isinstance(value, list):
+                args = tuple(value)
+            else:
+                args = (value,)
+        yield line_number, id_, endpoint.get_payload_from_args(args, params)
+
+
+class Progress(object):
+    """Tracks and periodically reports the throughput of a run."""
+
+    def __init__(self, interval, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.start = self.last = time.time()
+        self.done = 0
+        self.errors = 0
+
+    def update(self, error):
+        self.done += 1
+        self.errors += bool(error)
+        if self.interval and time.time() - self.last >= self.interval:
+            self.report()
+
+    def report(self):
+        self.last = time.time()
+        elapsed = self.last - self.start
+        print('{} done, {} errors, {:.1f} lines/s'.format(
+            self.done, self.errors, self.done / elapsed if elapsed else 0.0),
+            file=self.stream)
+
+
+class Checkpoint(object):
+    """Records the input lines whose results are written, and the number
+    of bytes of output they fill.
+
+    Results may complete out of order, so the lines are recorded as the
+    contiguous prefix of completed lines (`done`) plus the completed lines
+    after it. On resume, the output is truncated to `offset`, dropping the
+    results written after the last save, and the recorded lines are
+    skipped, so no result is written twice.
+    """
+
+    def __init__(self, path, interval=5.0):
+        self.path = path
+        self.interval = interval
+        self.done = 0
+        self.offset = 0
+        self._completed = set()
+        self._saved = time.time()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.done = state['done']
+            self.offset = state['offset']
+            self._completed.update(state['completed'])
+
+    @property
+    def started(self):
+        return bool(self.done or self._completed)
+
+    def is_complete(self, line_number):
+        return line_number < self.done or line_number in self._completed
+
+    def truncate(self, path):
+        """Drops the output written to `path` after the last save."""
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size > self.offset:
+            with open(path, 'r+b') as f:
+                f.truncate(self.offset)
+
+    def complete(self, line_number, output, size=0):
+        """Records that a line is done, after `size` bytes of its output
+        were written.
+        """
+        self.offset += size
+        self._completed.add(line_number)
+        while self.done in self._completed:
+            self._completed.remove(self.done)
+            self.done += 1
+        if self.path and time.time() - self._saved >= self.interval:
+            self.save(output)
+
+    def save(self, output):
+        output.flush()
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'done': self.done, 'offset': self.offset,
+                       'completed': sorted(self._completed)}, f)
+        replace(tmp, self.path)
+        self._saved = time.time()
+
+
+def run(args, stdin=sys.stdin, stdout=sys.stdout):
+    """Runs the bulk processing described by the parsed `args`."""
+    plasticity = Plasticity(args.token, url=args.url,
+                            pool_maxsize=args.workers)
+    endpoint = getattr(plasticity.sapien, args.endpoint)
+    params = parse_params(args.param)
+    checkpoint = Checkpoint(args.checkpoint)
+    progress = Progress(args.progress)
+
+    source = (stdin if args.input == '-' else
+              io.open(args.input, encoding='utf-8'))
+    if args.output == '-':
+        output = stdout
+    else:
+        if checkpoint.started:
+            checkpoint.truncate(args.output)
+        # Newlines aren't translated, so `Checkpoint.offset` counts bytes
+        output = io.open(args.output, 'a' if checkpoint.started else 'w',
+                         encoding='utf-8', newline='\n')
+
+    # Payloads in flight, by identity, since results may arrive unordered
+    in_flight = {}
+
+    def payloads():
+        for line_number, id_, payload in read_inputs(
+                source, endpoint, args.format, params, args.id_field,
+                skip=checkpoint.done):
+            if payload is None or checkpoint.is_complete(line_number):
+                checkpoint.complete(line_number, output)
+                continue
+            in_flight[id(payload)] = (line_number, id_)
+            yield payload
+
+    try:
+        for result in endpoint.post_many(
+                payloads(), workers=args.workers,
+                as_completed=args.unordered):
+            line_number, id_ = in_flight.pop(id(result.request))
+            record = {'id': id_, 'line': line_number}
+            if isinstance(result, endpoint.BatchError):
+                record['error'] = result.error_message
+            else:
+                record['response'] = result.response
+            # `json.dumps()` escapes non-ASCII, so a character is a byte
+            line = u'{}\n'.format(json.dumps(record))
+            output.write(line)
+            checkpoint.complete(line_number, output, len(line))
+            progress.update('error' in record or result.error)
+    finally:
+        if args.checkpoint:
+            checkpoint.save(output)
+        if output is not stdout:
+            output.close()
+        if source is not stdin:
+            source.close()
+        plasticity.close()
+    if args.progress:
+        progress.report()
+    return progress
+
+
+def main(argv=None):
+    run(parse_args(argv))
@@ -2,8 +2,13 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import re
+from array import array
+from collections import defaultdict, namedtuple
+
 from plasticity.utils import utils
 from plasticity.base.endpoint import Endpoint
+from plasticity.base.transport import RawResponse
 
 
 class Core(Endpoint):
@@ -28,6 +33,15 @@ class Core(Endpoint):
     plasticity.sapien.core.post('This is an example without NER.', ner=False)
     ```
 
+    Pass `fields` to request (and parse) only the outputs you need; the
+    `graph` and `ner` flags are set from them. The fields are 'tokens'
+    (for `tpls()`, `tokenize()`, `parts_of_speech()` and `lemmatize()`),
+    'dependencies', 'graph' and 'ner'.
+
+    ```python
+    plasticity.sapien.core.post('This is an example.', fields=['tokens'])
+    ```
+
 
     Returns:
 
@@ -56,6 +70,7 @@ class Core(Endpoint):
         ('ner', True),
         ('pretty', False)
     ]
+    FIELDS = ('tokens', 'dependencies', 'graph', 'ner')
 
     def __init__(self, plasticity):
         """Initializes a new Core Endpoint.
@@ -68,21 +83,206 @@ class Core(Endpoint):
         super(Core, self).__init__(plasticity)
         self.url = self.plasticity.sapien.url + 'core/'
 
+    @classmethod
+    def get_fields(cls, fields):
+        """Validates a projection of the Core outputs.
+
+        :param fields: The outputs needed, or None for all of them
+        :type fields: iterable|None
+        :returns: The fields, or `None` for all of them
+        :rtype: {frozenset|None}
+        :raises ValueError: If a field is unknown
+        """
+        if fields is None:
+            return None
+        fields = frozenset(fields)
+        unknown = fields.difference(cls.FIELDS)
+        if unknown:
+            raise ValueError('Unknown Core fields: {}.'.format(
+                ', '.join(sorted(unknown))))
+        if 'ner' in fields:
+            # The named entities are found in the graph
+            fields = fields.union(['graph'])
+        return fields
+
+    @classmethod
+    def get_projected_payload(cls, payload, fields):
+        """Sets the `graph` and `ner` flags of a payload that aren't already
+        set to produce only the given fields.
+
+        :param payload: The request payload (it is not modified)
+        :type payload: dict
+        :param fields: The outputs needed
+        :type fields: frozenset
+        :returns: The projected payload
+        :rtype: {dict}
+        """
+        projected = dict(payload)
+        projected.setdefault('ner', 'ner' in fields)
+        projected.setdefault('graph', 'graph' in fields)
+        return projected
+
+    def post(self, *args, **kwargs):
+        """Sends text to the Core endpoint.
+
+        Takes the `PARAMS` as positional or keyword arguments (or a single
+        payload dict), plus an optional `fields` projection.
+        :returns: The response
+        :rtype: {Core.Response}
+        """
+        fields = self.get_fields(kwargs.pop('fields', None))
+        if fields is None:
+            return self._request('POST', *args, **kwargs)
+        payload = self.get_projected_payload(
+            self.get_payload_from_args(args, kwargs), fields)
+        return self._request_payload('POST', payload, fields=fields)
+
+    def post_many(self, payloads, workers=None, as_completed=False,
+                  fields=None, **kwargs):
+        """Sends a batch of texts to the Core endpoint.
+
+        See `Endpoint.post_many()`; every payload gets the `fields`
+        projection.
+        """
+        fields = self.get_fields(fields)
+        if fields is None:
+            return super(Core, self).post_many(
+                payloads, workers=workers, as_completed=as_completed,
+                **kwargs)
+        # Each payload is projected by its own request, so a bad payload
+        # still fails alone with a `BatchError`
+        return self._request_many(
+            'POST', payloads, workers, as_completed, kwargs, fields=fields)
+
+    @classmethod
+    def get_batch_payload(cls, args, kwargs, fields=None):
+        payload = cls.get_payload_from_args(args, kwargs)
+        if fields is None:
+            return payload
+        return cls.get_projected_payload(payload, fields)
+
+    def post_document(self, text, chunk_size=2000, workers=None, **kwargs):
+        """Processes a long document in parallel chunks.
+
+        Splits the text into chunks of whole sentences of about
+        `chunk_size` characters, posts them concurrently (see
+        `post_many()`) and stitches the results back into a single
+        `Core.Response`, as if the whole text had been posted at once.
+
+        Token indices in the API results are relative to their sentence,
+        so they need no correction. Each `Sentence` also gets the
+        character `offset` at which it starts in `text` (sent as an extra
+        `offset` field of each sentence json), and the response gets the
+        `chunk_offsets` at which each chunk starts.
+        :param text: The document text
+        :type text: str
+        :param chunk_size: The target number of characters per chunk,
+                           defaults to 2000
+        :type chunk_size: int, optional
+        :param workers: The number of concurrent requests, defaults to the
+                        transport's `pool_maxsize`
+        :type workers: int, optional
+        :returns: The stitched response, or the first chunk's error response
+        :rtype: {Core.Response}
+        """
+        fields = self.get_fields(kwargs.pop('fields', None))
+        chunks = split_sentences(text, chunk_size)
+        payloads = [dict(kwargs, text=text[start:end])
+                    for start, end in chunks]
+        data = []
+        for (start, end), result in zip(
+                chunks, self.post_many(
+                    payloads, workers=workers, fields=fields)):
+            if isinstance(result, self.BatchError):
+                raise result.exception
+            if result.error:
+                return result
+            cursor = start
+            for d in result.response.get('data') or []:
+                alternatives = (d.get('alternatives', [])
+                                if d.get('type') == 'sentenceGroup' else [d])
+                offset = cursor
+                for a in alternatives:
+                    a['offset'] = find_sentence(text, a.get('sentence'),
+                                                cursor, end)
+                    offset = max(offset, a['offset'] + len(
+                        a.get('sentence') or ''))
+                cursor = offset
+                data.append(d)
+
+        request = dict(kwargs, text=text)
+        if fields is not None:
+            request = self.get_projected_payload(request, fields)
+        result = self.Response(
+            RawResponse(200, None, decoded={'data': data, 'error': False}),
+            request=request, codec=self.plasticity.codec, fields=fields)
+        result.chunk_offsets = [start for start, _ in chunks]
+        return result
+
     class Response(Endpoint.Response):
-        def __init__(self, response):
-            super(Core.Response, self).__init__(response)
-            new_data = []
-            for d in (self.data or []):
-                if d['type'] == 'sentenceGroup':
-                    new_data.append(SentenceGroup.from_json(d))
-                elif d['type'] == 'sentence':
-                    new_data.append(Sentence.from_json(d))
-            self.data = new_data
+        def __init__(self, response, *args, **kwargs):
+            fields = kwargs.pop('fields', None)
+            super(Core.Response, self).__init__(response, *args, **kwargs)
+            # The `SentenceGroup`s and `Sentence`s in `data` are only built
+            # the first time `data` is accessed, keeping only the `fields`
+            self._raw_data, self._data = self._data or [], None
+            self.fields = fields
             self.graph_enabled = self.request.get(
                 'graph', Core.get_param_default('graph'))
             self.ner_enabled = self.request.get(
                 'ner', Core.get_param_default('ner'))
 
+        @property
+        def data(self):
+            """The `SentenceGroup`s (or `Sentence`s) of the response."""
+            if self._data is None and self._raw_data is not None:
+                new_data = []
+                fields = self.fields
+                for d in self._raw_data:
+                    if d['type'] == 'sentenceGroup':
+                        new_data.append(SentenceGroup.from_json(d, fields))
+                    elif d['type'] == 'sentence':
+                        new_data.append(Sentence.from_json(d, fields))
+                self._data, self._raw_data = new_data, None
+            return self._data
+
+        @data.setter
+        def data(self, value):
+            self._data, self._raw_data = value, None
+            self._columns = None
+            self._dependency_arrays = None
+            self._entity_index = None
+
+        def _require(self, field, method):
+            """Raises if `field` was left out of the `fields` projection."""
+            if self.fields is not None and field not in self.fields:
+                raise AttributeError('The `{}` field must be requested in '
+                                     'order to use `{}()`.'.format(
+                                         field, method))
+
+        def _sentence_groups(self):
+            """Gets the `Sentence`s of each sentence group.
+
+            A `Sentence` outside of a `SentenceGroup` (when ner was
+            disabled) is treated as a group with a single alternative.
+            """
+            return [d.alternatives if isinstance(d, SentenceGroup) else [d]
+                    for d in self.data]
+
+        def columns(self):
+            """Gets the token/POS/lemma of text as columns.
+
+            The columns are built once per response and cached. See
+            `TokenColumns` for their layout.
+            :returns: The t/p/l columns of the text
+            :rtype: {TokenColumns}
+            """
+            self._require('tokens', 'columns')
+            if self._columns is None:
+                self._columns = TokenColumns.from_sentence_groups(
+                    self._sentence_groups())
+            return self._columns
+
         def __str__(self):
             """Pretty prints important details about the Core Response."""
             output = 'Core Response'
@@ -113,6 +313,7 @@ class Core(Endpoint):
             :returns: The t/p/l's of the text (token, POS, lemma)
             :rtype: {list}
             """
+            self._require('tokens', 'tpls')
             output = []
             if self.ner_enabled:
                 for sentence_group in self.data:
@@ -135,13 +336,18 @@ class Core(Endpoint):
             another list containing the t/p/l for each alternative. If
             ner was disabled, returns a list, where each index is a t/p/l.
             """
-            tpls = self.tpls()
+            columns = self.columns()
+            strings = columns.strings
+            column = (columns.tokens, columns.pos, columns.lemmas)[tpl_index]
+            if not self.ner_enabled:
+                return [strings[i] for i in column]
             output = []
-            if self.ner_enabled:
-                for alternative in tpls:
-                    output.append([tpl[tpl_index] for tpl in alternative])
-            else:
-                output = [tpl[tpl_index] for tpl in tpls]
+            sentence_offsets = columns.sentence_offsets
+            group_offsets = columns.group_offsets
+            for g in range(len(group_offsets) - 1):
+                start = sentence_offsets[group_offsets[g]]
+                end = sentence_offsets[group_offsets[g + 1]]
+                output.append([strings[i] for i in column[start:end]])
             return output
 
         def tokenize(self):
@@ -202,6 +408,7 @@ class Core(Endpoint):
                 raise AttributeError('The `graph` flag must be enabled '
                                      'in your request in order to use '
                                      '`graphs()`.')
+            self._require('graph', 'graphs')
 
             graphs = []
             if self.ner_enabled:
@@ -228,6 +435,7 @@ class Core(Endpoint):
             :returns: The dependencies of the text (index, index, name)
             :rtype: {list}
             """
+            self._require('dependencies', 'dependencies')
             output = []
             if self.ner_enabled:
                 for sentence_group in self.data:
@@ -240,6 +448,22 @@ class Core(Endpoint):
                     output.extend(sentence.dependencies)
             return output
 
+        def dependency_arrays(self):
+            """Gets the syntax dependency trees of text as packed arrays.
+
+            The arrays are built once per response and cached. See
+            `DependencyArrays` for their layout and the tree queries they
+            support.
+            :returns: The dependency trees of the text
+            :rtype: {DependencyArrays}
+            """
+            self._require('dependencies', 'dependency_arrays')
+            if self._dependency_arrays is None:
+                self._dependency_arrays = \
+                    DependencyArrays.from_sentence_groups(
+                        self._sentence_groups())
+            return self._dependency_arrays
+
         def ner(self):
             """Handles the Named Entity Recognition endpoint.
 
@@ -252,6 +476,8 @@ class Core(Endpoint):
             >>> results[sentence_index][alternative_index]
             # dict of entities to their token index in the sentence
 
+            Each call returns new dicts and lists, so they may be changed
+            freely. The `Concept`s in them are the ones of the graph.
             :returns: The named entities of the text
             :rtype: {list}
             """
@@ -260,25 +486,422 @@ class Core(Endpoint):
                                      'be enabled in your request in order '
                                      'to use `ner()`.')
 
-            data_out = []
-            for sentence_group in self.data:
-                sentence_group_out = []
-                for alternative in sentence_group.alternatives:
-                    alternative_out = {}
-                    if isinstance(alternative, Sentence):
-                        for graph in alternative.graph:
-                            if isinstance(graph, Relation):
-                                entities = graph.get_entities(ner_only=True)
-                                alternative_out.update(entities)
-                        sentence_group_out.append(alternative_out)
-                data_out.append(sentence_group_out)
-            return data_out
+            # Copies every dict and list, so changing the result can't
+            # change the cached `EntityIndex` (or later calls). The
+            # `Concept`s are shared with the graph, like its other objects.
+            return [[{index: {key: list(value) if isinstance(value, list)
+                              else value for key, value in values.items()}
+                      for index, values in alternative.items()}
+                     for alternative in sentence_group]
+                    for sentence_group in self.entity_index().entities]
+
+        def entity_index(self):
+            """Gets an index of the named entities of text.
+
+            The index is built once per response and cached, and `ner()`
+            answers from it. See `EntityIndex` for the lookups it supports.
+            :returns: The named entity index of the text
+            :rtype: {EntityIndex}
+            """
+            if not self.ner_enabled or not self.graph_enabled:
+                raise AttributeError('The `ner` and `graph` flags must '
+                                     'be enabled in your request in order '
+                                     'to use `entity_index()`.')
+            self._require('ner', 'entity_index')
+            if self._entity_index is None:
+                self._entity_index = EntityIndex.from_sentence_groups(
+                    self._sentence_groups())
+            return self._entity_index
+
+
+SENTENCE_END = re.compile(r'[.!?]+[\'")\]]*\s+')
+
+
+def split_sentences(text, chunk_size):
+    """Splits text into chunks of whole sentences.
+
+    Sentences are packed into a chunk until it would exceed `chunk_size`
+    characters. A single sentence longer than that gets a chunk of its own.
+    :param text: The text to split
+    :type text: str
+    :param chunk_size: The target number of characters per chunk
+    :type chunk_size: int
+    :returns: The (start, end) character offsets of each chunk
+    :rtype: {list}
+    """
+    ends = [m.end() for m in SENTENCE_END.finditer(text)]
+    if not ends or ends[-1] < len(text):
+        ends.append(len(text))
+    chunks = []
+    start = end = 0
+    for sentence_end in ends:
+        if sentence_end - start > chunk_size and end > start:
+            chunks.append((start, end))
+            start = end
+        end = sentence_end
+    if end > start:
+        chunks.append((start, end))
+    return chunks
+
+
+def find_sentence(text, sentence, start, end):
+    """Finds the character offset of a sentence within `text[start:end]`.
+
+    The API may change the case of a sentence (e.g. in NER alternatives),
+    so the search ignores case. If the sentence isn't found, `start` is
+    returned.
+    """
+    if sentence:
+        match = re.compile(re.escape(sentence), re.IGNORECASE).search(
+            text, start, end)
+        if match is not None:
+            return match.start()
+    return start
+
+
+class TokenColumns(object):
+    """Holds the tokens, parts of speech and lemmas of a `Core.Response`
+    as columns.
+
+    Every distinct string is stored once in `strings`, and `tokens`, `pos`
+    and `lemmas` are parallel `array`s of indices into it, with one item per
+    token of every sentence (alternatives included) in response order.
+
+    The tokens of sentence `i` are at
+    `sentence_offsets[i]:sentence_offsets[i + 1]`, and the sentences of
+    sentence group `g` are at `group_offsets[g]:group_offsets[g + 1]`.
+    """
+    __slots__ = ('strings', 'tokens', 'pos', 'lemmas', 'sentence_offsets',
+                 'group_offsets')
+
+    def __init__(self, strings, tokens, pos, lemmas, sentence_offsets,
+                 group_offsets):
+        self.strings = strings
+        self.tokens = tokens
+        self.pos = pos
+        self.lemmas = lemmas
+        self.sentence_offsets = sentence_offsets
+        self.group_offsets = group_offsets
+
+    def __repr__(self):
+        return '<TokenColumns {}>'.format(id(self))
+
+    def __len__(self):
+        return len(self.tokens)
+
+    @classmethod
+    def from_sentence_groups(cls, sentence_groups):
+        """Builds `TokenColumns` from the `Sentence`s of each group."""
+        strings = []
+        ids = {}
+        columns = (array('i'), array('i'), array('i'))
+        sentence_offsets = array('i', [0])
+        group_offsets = array('i', [0])
+        for sentence_group in sentence_groups:
+            for sentence in sentence_group:
+                for tpl in sentence.tokens or []:
+                    for column, string in zip(columns, tpl):
+                        i = ids.get(string)
+                        if i is None:
+                            i = ids[string] = len(strings)
+                            strings.append(string)
+                        column.append(i)
+                sentence_offsets.append(len(columns[0]))
+            group_offsets.append(len(sentence_offsets) - 1)
+        return cls(strings, columns[0], columns[1], columns[2],
+                   sentence_offsets, group_offsets)
+
+    def sentence(self, i):
+        """Gets the [token, POS, lemma]s of the sentence at index `i`."""
+        start, end = self.sentence_offsets[i], self.sentence_offsets[i + 1]
+        strings = self.strings
+        return [[strings[t], strings[p], strings[m]] for t, p, m in zip(
+            self.tokens[start:end], self.pos[start:end],
+            self.lemmas[start:end])]
+
+    def to_numpy(self):
+        """Exports the columns as NumPy arrays.
+
+        The integer columns share memory with these columns (no copy);
+        `strings` becomes an object array.
+
+        Requires the `numpy` package.
+        :returns: The columns by name
+        :rtype: {dict}
+        """
+        import numpy as np
+        arrays = {'strings': np.array(self.strings, dtype=object)}
+        for name in self.__slots__[1:]:
+            arrays[name] = np.frombuffer(getattr(self, name), dtype=np.intc)
+        return arrays
+
+
+class DependencyArrays(object):
+    """Holds the syntax dependency trees of a `Core.Response` as packed
+    arrays.
+
+    There is one item per token of every sentence (alternatives included)
+    in response order, laid out like `TokenColumns`: the tokens of
+    sentence `i` are at `sentence_offsets[i]:sentence_offsets[i + 1]`.
+
+    `heads[t]` is the index of the head of token `t` (or -1 if `t` is a
+    root) and `labels[t]` is the index of its relation name in
+    `label_table` (or -1). Indices into these arrays are global to the
+    response; the per-sentence queries take and return indices local to
+    the sentence, like the API does.
+
+    The children index and subtree spans are each computed for the whole
+    response in a single O(n) pass the first time they are needed.
+    """
+    __slots__ = ('heads', 'labels', 'label_table', 'sentence_offsets',
+                 '_child_offsets', '_children', '_spans')
+
+    def __init__(self, heads, labels, label_table, sentence_offsets):
+        self.heads = heads
+        self.labels = labels
+        self.label_table = label_table
+        self.sentence_offsets = sentence_offsets
+        self._child_offsets = None
+        self._children = None
+        self._spans = None
+
+    def __repr__(self):
+        return '<DependencyArrays {}>'.format(id(self))
+
+    def __len__(self):
+        return len(self.heads)
+
+    @classmethod
+    def from_sentence_groups(cls, sentence_groups):
+        """Builds `DependencyArrays` from the `Sentence`s of each group."""
+        heads = array('i')
+        labels = array('i')
+        label_table = []
+        label_ids = {}
+        sentence_offsets = array('i', [0])
+        for sentence_group in sentence_groups:
+            for sentence in sentence_group:
+                dependencies = sentence.dependencies or []
+                start = len(heads)
+                size = len(sentence.tokens or []) or max(
+                    [d[0] + 1 for d in dependencies] or [0])
+                heads.extend([-1] * size)
+                labels.extend([-1] * size)
+                for dependent, head, label in dependencies:
+                    if not 0 <= dependent < size:
+                        continue
+                    if 0 <= head < size and head != dependent:
+                        heads[start + dependent] = start + head
+                    i = label_ids.get(label)
+                    if i is None:
+                        i = label_ids[label] = len(label_table)
+                        label_table.append(label)
+                    labels[start + dependent] = i
+                sentence_offsets.append(len(heads))
+        return cls(heads, labels, label_table, sentence_offsets)
+
+    def _build_children(self):
+        """Builds a CSR index of the children of every token."""
+        heads = self.heads
+        counts = array('i', [0]) * (len(heads) + 1)
+        for head in heads:
+            if head >= 0:
+                counts[head + 1] += 1
+        for t in range(len(heads)):
+            counts[t + 1] += counts[t]
+        children = array('i', [0]) * counts[-1]
+        fill = array('i', counts)
+        for t, head in enumerate(heads):
+            if head >= 0:
+                children[fill[head]] = t
+                fill[head] += 1
+        self._child_offsets, self._children = counts, children
+
+    def children_of(self, t):
+        """Gets the global indices of the children of global token `t`."""
+        if self._children is None:
+            self._build_children()
+        return self._children[self._child_offsets[t]:
+                              self._child_offsets[t + 1]]
+
+    def children(self, sentence, index):
+        """Gets the children of a token.
+
+        :param sentence: The index of the sentence
+        :type sentence: int
+        :param index: The index of the token in the sentence
+        :type index: int
+        :returns: The indices of the children in the sentence
+        :rtype: {list}
+        """
+        start = self.sentence_offsets[sentence]
+        return [c - start for c in self.children_of(start + index)]
+
+    def roots(self):
+        """Gets the root of every sentence.
+
+        :returns: The index of the root in each sentence (or -1 if the
+                  sentence has none)
+        :rtype: {array}
+        """
+        roots = array('i', [-1]) * (len(self.sentence_offsets) - 1)
+        heads = self.heads
+        for i in range(len(roots)):
+            start = self.sentence_offsets[i]
+            for t in range(start, self.sentence_offsets[i + 1]):
+                if heads[t] < 0 and self.labels[t] >= 0:
+                    roots[i] = t - start
+                    break
+        return roots
+
+    def subtree_spans(self):
+        """Gets the span of the subtree of every token.
+
+        :returns: Arrays of the first and last + 1 global token index
+                  covered by the subtree headed by each token
+        :rtype: {tuple}
+        """
+        if self._spans is None:
+            heads = self.heads
+            starts = array('i', range(len(heads)))
+            ends = array('i', range(1, len(heads) + 1))
+            # Visit tokens children-first, then fold each into its head
+            for t in reversed(self._top_down_order()):
+                head = heads[t]
+                if head >= 0:
+                    if starts[t] < starts[head]:
+                        starts[head] = starts[t]
+                    if ends[t] > ends[head]:
+                        ends[head] = ends[t]
+            self._spans = (starts, ends)
+        return self._spans
+
+    def _top_down_order(self):
+        """Orders the tokens so every head comes before its children."""
+        heads = self.heads
+        order = array('i', [t for t, head in enumerate(heads) if head < 0])
+        i = 0
+        while i < len(order):
+            order.extend(self.children_of(order[i]))
+            i += 1
+        return order
+
+    def subtree_span(self, sentence, index):
+        """Gets the span of the subtree headed by a token.
+
+        :param sentence: The index of the sentence
+        :type sentence: int
+        :param index: The index of the token in the sentence
+        :type index: int
+        :returns: The first and last + 1 index in the sentence covered by
+                  the subtree
+        :rtype: {tuple}
+        """
+        start = self.sentence_offsets[sentence]
+        starts, ends = self.subtree_spans()
+        return starts[start + index] - start, ends[start + index] - start
+
+    def head_path(self, sentence, index):
+        """Gets the path from a token up to the root of its sentence.
+
+        :param sentence: The index of the sentence
+        :type sentence: int
+        :param index: The index of the token in the sentence
+        :type index: int
+        :returns: The indices in the sentence of the token, its head, its
+                  head's head, and so on up to the root
+        :rtype: {list}
+        """
+        start = self.sentence_offsets[sentence]
+        size = self.sentence_offsets[sentence + 1] - start
+        heads = self.heads
+        path = [index]
+        t = heads[start + index]
+        while t >= 0 and len(path) <= size:
+            path.append(t - start)
+            t = heads[t]
+        return path
+
+
+EntityLocation = namedtuple(
+    'EntityLocation', ['sentence_group', 'alternative', 'index'])
+
+
+class EntityIndex(object):
+    """Indexes the named entities of a `Core.Response`.
+
+    `entities[g][a]` is the dict of entities (by token index) of alternative
+    `a` of sentence group `g`, exactly as returned by `Core.Response.ner()`.
+    `by_id`, `by_label` and `by_text` map each `Concept` ID, `Concept` label
+    and entity surface form to the `EntityLocation`s
+    (sentence group, alternative, token index) where it occurs.
+    """
+    __slots__ = ('entities', 'by_id', 'by_label', 'by_text')
+
+    def __init__(self, entities, by_id, by_label, by_text):
+        self.entities = entities
+        self.by_id = by_id
+        self.by_label = by_label
+        self.by_text = by_text
+
+    def __repr__(self):
+        return '<EntityIndex {}>'.format(id(self))
+
+    @classmethod
+    def from_sentence_groups(cls, sentence_groups):
+        """Builds an `EntityIndex` from the `Sentence`s of each group."""
+        entities = []
+        by_id = defaultdict(list)
+        by_label = defaultdict(list)
+        by_text = defaultdict(list)
+        for g, sentence_group in enumerate(sentence_groups):
+            sentence_group_entities = []
+            for a, sentence in enumerate(sentence_group):
+                alternative_entities = get_entities(
+                    sentence.graph or [], ner_only=True)
+                for index, values in alternative_entities.items():
+                    location = EntityLocation(g, a, index)
+                    by_text[values['entity']].append(location)
+                    for concept in values['ner']:
+                        by_id[concept.id_].append(location)
+                        by_label[concept.label].append(location)
+                sentence_group_entities.append(alternative_entities)
+            entities.append(sentence_group_entities)
+        return cls(entities, dict(by_id), dict(by_label), dict(by_text))
+
+    def find(self, id_=None, label=None, text=None):
+        """Finds the locations of the entities matching every criterion.
+
+        :param id_: A `Concept` ID, defaults to None
+        :type id_: str, optional
+        :param label: A `Concept` label, defaults to None
+        :type label: str, optional
+        :param text: An entity surface form, defaults to None
+        :type text: str, optional
+        :returns: The matching `EntityLocation`s, in response order
+        :rtype: {list}
+        """
+        matches = None
+        for index, key in ((self.by_id, id_), (self.by_label, label),
+                           (self.by_text, text)):
+            if key is None:
+                continue
+            locations = index.get(key, [])
+            matches = (set(locations) if matches is None
+                       else matches.intersection(locations))
+        return sorted(matches or [])
+
+    def get(self, location):
+        """Gets the entity values at an `EntityLocation`."""
+        g, a, index = location
+        return self.entities[g][a].get(index)
 
 
 class SentenceGroup(object):
     """Holds the `SentenceGroup` data within a `CoreResponse` from a
     Core API call.
     """
+    __slots__ = ('_alternatives', '_raw_alternatives', '_fields')
 
     def __init__(self, alternatives):
         """Initializes a new `SentenceGroup`.
@@ -291,7 +914,24 @@ class SentenceGroup(object):
         :param alternatives: The `Sentence` alternatives
         :type alternatives: {list}
         """
-        self.alternatives = alternatives
+        self._alternatives = alternatives
+        self._raw_alternatives = None
+        self._fields = None
+
+    @property
+    def alternatives(self):
+        """The `Sentence` alternatives, built on first access."""
+        if self._raw_alternatives is not None:
+            fields = self._fields
+            self._alternatives = [Sentence.from_json(a, fields)
+                                  for a in self._raw_alternatives
+                                  if a.get('type') == 'sentence']
+            self._raw_alternatives = None
+        return self._alternatives
+
+    @alternatives.setter
+    def alternatives(self, value):
+        self._alternatives, self._raw_alternatives = value, None
 
     def __repr__(self):
         return '<SentenceGroup {}>'.format(id(self))
@@ -307,20 +947,30 @@ class SentenceGroup(object):
         return output
 
     @classmethod
-    def from_json(cls, sg):
-        """Builds a `SentenceGroup` from a json object."""
-        alternatives = [Sentence.from_json(a)
-                        for a in sg.get('alternatives', [])
-                        if a.get('type') == 'sentence']
-        return cls(alternatives)
+    def from_json(cls, sg, fields=None):
+        """Builds a `SentenceGroup` from a json object.
+
+        The alternatives are kept as json until they are first accessed.
+        :param sg: The sentence group json
+        :type sg: dict
+        :param fields: The fields of the `Sentence`s to build, defaults to
+                       None (all of them)
+        :type fields: frozenset, optional
+        """
+        sentence_group = cls(None)
+        sentence_group._raw_alternatives = sg.get('alternatives', [])
+        sentence_group._fields = fields
+        return sentence_group
 
 
 class Sentence(object):
     """Holds the `Sentence` data within a `CoreResponse` or
     `SentenceGroup` from a Core API call.
     """
+    __slots__ = ('sentence', 'tokens', 'dependencies', 'offset', '_graph',
+                 '_raw_graph')
 
-    def __init__(self, sentence, tokens, graph, dependencies):
+    def __init__(self, sentence, tokens, graph, dependencies, offset=None):
         """Initializes a new `Sentence`.
 
         Creates a `Sentence` object which holds the data for each sentence in
@@ -334,11 +984,28 @@ class Sentence(object):
         :type graph: None|list
         :param dependencies: A list of the token dependencies in the sentence
         :type dependencies: list
+        :param offset: The character offset of the sentence in the text,
+                       defaults to None (unknown)
+        :type offset: int, optional
         """
         self.sentence = sentence
         self.tokens = tokens
-        self.graph = graph
         self.dependencies = dependencies
+        self.offset = offset
+        self._graph = graph
+        self._raw_graph = None
+
+    @property
+    def graph(self):
+        """The `Graph` of the sentence, built on first access."""
+        if self._raw_graph is not None:
+            self._graph = Graph.from_json(self._raw_graph)
+            self._raw_graph = None
+        return self._graph
+
+    @graph.setter
+    def graph(self, value):
+        self._graph, self._raw_graph = value, None
 
     def __repr__(self):
         return '<Sentence {}>'.format(id(self))
@@ -361,15 +1028,29 @@ class Sentence(object):
         return output
 
     @classmethod
-    def from_json(cls, s):
-        """Builds a `Sentence` from a json object."""
-        sentence = s.get('sentence')
-        tokens = s.get('tokens')
-        graph = s.get('graph')
-        if graph is not None:
-            graph = Graph.from_json(graph)
-        dependencies = s.get('dependencies')
-        return cls(sentence, tokens, graph, dependencies)
+    def from_json(cls, s, fields=None):
+        """Builds a `Sentence` from a json object.
+
+        The graph is kept as json until it is first accessed. The outputs
+        left out of `fields` are not kept at all.
+        :param s: The sentence json
+        :type s: dict
+        :param fields: The fields to keep, defaults to None (all of them)
+        :type fields: frozenset, optional
+        """
+        if fields is None:
+            sentence = cls(s.get('sentence'), s.get('tokens'), None,
+                           s.get('dependencies'), s.get('offset'))
+            sentence._raw_graph = s.get('graph')
+            return sentence
+        sentence = cls(
+            s.get('sentence'),
+            s.get('tokens') if 'tokens' in fields else None, None,
+            s.get('dependencies') if 'dependencies' in fields else None,
+            s.get('offset'))
+        if 'graph' in fields:
+            sentence._raw_graph = s.get('graph')
+        return sentence
 
 
 class Graph(list):
@@ -379,6 +1060,7 @@ class Graph(list):
     Returns a `Graph`, which will be an empty list or a list with each
     `Relation` contained in the `Sentence`.
     """
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         super(Graph, self).__init__(args[0])
@@ -403,11 +1085,195 @@ class Graph(list):
                  if x.get('type') == 'relation']
         return cls(graph)
 
+    def get_entities(self, ner_only=False):
+        """Gets the entities of every `Relation` in the `Graph`.
+
+        :param ner_only: Only entities with NER values, defaults to False
+        :type ner_only: bool, optional
+        :returns: A dict of entities found in the Graph by their index
+        :rtype: {dict}
+        """
+        return get_entities(self, ner_only)
+
+    def walk(self):
+        """Walks every node of every `Relation` in the `Graph`.
+
+        See `walk()`.
+        :returns: The nodes of the `Graph`
+        :rtype: {generator}
+        """
+        return walk(self)
+
+
+def walk(nodes):
+    """Walks a tree of `Relation`s depth first.
+
+    Yields each node before its children, which are visited in the order:
+    a `Relation`'s subject, predicate, object, prepositions and qualified
+    object; a `Preposition`'s object and nested prepositions. The walk is
+    iterative, so arbitrarily deep graphs don't hit the recursion limit.
+    :param nodes: The nodes to start from (e.g. a `Graph`)
+    :type nodes: list
+    :returns: Every `Relation`, `Entity`, `Predicate` and `Preposition`
+    :rtype: {generator}
+    """
+    stack = list(reversed(nodes))
+    pop, push, extend = stack.pop, stack.append, stack.extend
+    while stack:
+        node = pop()
+        yield node
+        cls = node.__class__
+        if cls is Entity or cls is Predicate:
+            continue
+        # Children are pushed in reverse so they are popped in order
+        if cls is Relation or isinstance(node, Relation):
+            if node.qualified_object is not None:
+                push(node.qualified_object)
+            if node.prepositions:
+                extend(node.prepositions[::-1])
+            if node.object is not None:
+                push(node.object)
+            if node.predicate is not None:
+                push(node.predicate)
+            if node.subject is not None:
+                push(node.subject)
+        elif cls is Preposition or isinstance(node, Preposition):
+            if node.nested_prepositions:
+                extend(node.nested_prepositions[::-1])
+            if node.preposition_object is not None:
+                push(node.preposition_object)
+
+
+def get_entities(nodes, ner_only=False):
+    """Gets the entities in a tree of `Relation`s.
+
+    The entities are found depth first in the same order as `walk()`, so
+    when several share an index the first one found is kept. Unlike the
+    recursive traversal of older versions, the entities under a
+    `Relation`'s qualified object and a `Preposition`'s nested
+    prepositions are included. The traversal is iterative, so arbitrarily
+    deep graphs don't hit the recursion limit.
+    :param nodes: The nodes to start from (e.g. a `Graph`)
+    :type nodes: list
+    :param ner_only: Only entities with NER values, defaults to False
+    :type ner_only: bool, optional
+    :returns: A dict of entities found by their index
+    :rtype: {dict}
+    """
+    entities = {}
+    # Only the nodes that can hold entities are pushed (not predicates)
+    stack = list(reversed(nodes))
+    pop, push, extend = stack.pop, stack.append, stack.extend
+    while stack:
+        x = pop()
+        cls = x.__class__
+        if cls is Relation or (cls is not Entity and
+                               cls is not Preposition and
+                               isinstance(x, Relation)):
+            # Children are pushed in reverse so they are popped in order
+            if x.qualified_object is not None:
+                push(x.qualified_object)
+            if x.prepositions:
+                extend(x.prepositions[::-1])
+            if x.object is not None:
+                push(x.object)
+            if x.subject is not None:
+                push(x.subject)
+        elif cls is Entity or (cls is not Preposition and
+                               isinstance(x, Entity)):
+            if (x.ner or not ner_only) and x.index not in entities:
+                values = {}
+                values['index'] = x.index
+                values['entity'] = x.entity
+                if x.ner:
+                    values['ner'] = x.ner
+                entities[x.index] = values
+        elif cls is Preposition or isinstance(x, Preposition):
+            if x.nested_prepositions:
+                extend(x.nested_prepositions[::-1])
+            if x.preposition_object is not None:
+                push(x.preposition_object)
+    return entities
+
+
+# The key paths of the nested objects' types, compiled once for `from_json()`
+SUBJECT_TYPE = utils.KeyPath('subject', 'type')
+OBJECT_TYPE = utils.KeyPath('object', 'type')
+QUALIFIED_OBJECT_TYPE = utils.KeyPath('qualified_object', 'type')
+PREPOSITION_OBJECT_TYPE = utils.KeyPath('prepositionObject', 'type')
+
+
+# The depth of nested relations built recursively by `from_json()`, past
+# which the rest of a graph is built iteratively by `build_from_json()`
+MAX_RECURSION_DEPTH = 64
+
+
+def build_from_json(cls, root):
+    """Builds a `Relation` or `Preposition` and everything nested in it
+    from a json object, without recursion.
+
+    The json objects of the nested relations and prepositions are listed
+    parents first, then built in reverse, so every node is built after its
+    children.
+    :param cls: `Relation` or `Preposition`
+    :type cls: type
+    :param root: The json object
+    :type root: dict
+    :returns: The built node
+    :rtype: {Relation|Preposition}
+    """
+    order = []
+    stack = [(cls, root)]
+    pop, push = stack.pop, stack.append
+    while stack:
+        node = pop()
+        order.append(node)
+        node_cls, j = node
+        if node_cls is Relation:
+            if SUBJECT_TYPE.get(j) == 'relation':
+                push((Relation, j['subject']))
+            if OBJECT_TYPE.get(j) == 'relation':
+                push((Relation, j['object']))
+            if QUALIFIED_OBJECT_TYPE.get(j) == 'relation':
+                push((Relation, j['qualified_object']))
+            prepositions = j.get('prepositions')
+        else:
+            if PREPOSITION_OBJECT_TYPE.get(j) == 'relation':
+                push((Relation, j['prepositionObject']))
+            prepositions = j.get('nestedPrepositions')
+        if prepositions:
+            for p in prepositions:
+                if p.get('type') == 'preposition':
+                    push((Preposition, p))
+    built = {}
+    for node_cls, j in reversed(order):
+        built[id(j)] = node_cls._from_json(j, built=built)
+    return built[id(root)]
+
+
+def _build_child(cls, j, built, depth):
+    """Builds a nested `Relation` or `Preposition` for `_from_json()`."""
+    if built is not None:
+        return built[id(j)]
+    if depth < MAX_RECURSION_DEPTH:
+        return cls._from_json(j, depth=depth + 1)
+    return build_from_json(cls, j)
+
 
 class Relation(object):
     """Holds the `Relation` data within a `Sentence` from a
     Core API call.
+
+    `inferred`, `nested`, `qualified`, `artificial_type`, `_features` and
+    `confidence` are only sent by the API for top level relations. Nested
+    relations get their defaults (False, False, False, None, [] and 1.0).
     """
+    __slots__ = (
+        'qualifiers', 'question', 'question_auxiliary',
+        'verb_modifiers_subject_prefix', 'subject', 'predicate', 'object',
+        'verb_modifiers_object_suffix', 'prepositions', 'qualified_object',
+        'inferred', 'nested', 'qualified', 'artificial_type', '_features',
+        'confidence', 'top_level')
 
     def __init__(
             self,
@@ -438,13 +1304,13 @@ class Relation(object):
         self.verb_modifiers_object_suffix = verb_modifiers_object_suffix
         self.prepositions = prepositions
         self.qualified_object = qualified_object
-        if top_level:
-            self.inferred = inferred
-            self.nested = nested
-            self.qualified = qualified
-            self.artificial_type = artificial_type
-            self._features = _features
-            self.confidence = confidence
+        self.inferred = inferred
+        self.nested = nested
+        self.qualified = qualified
+        self.artificial_type = artificial_type
+        self._features = _features
+        self.confidence = confidence
+        self.top_level = top_level
 
     def __repr__(self):
         return '<Relation {}>'.format(id(self))
@@ -490,29 +1356,44 @@ class Relation(object):
 
     @classmethod
     def from_json(cls, r, top_level=False):
-        """Builds a `Relation` from a json object."""
+        """Builds a `Relation` from a json object.
+
+        Relations nested deeper than `MAX_RECURSION_DEPTH` are built
+        iteratively (see `build_from_json()`), so arbitrarily deep graphs
+        don't hit the recursion limit.
+        """
+        return cls._from_json(r, top_level)
+
+    @classmethod
+    def _from_json(cls, r, top_level=False, built=None, depth=0):
+        """Builds a `Relation` at some `depth` of nesting, whose nested
+        relations and prepositions may already be `built` (by the id of
+        their json objects).
+        """
         qualifiers = r.get('qualifiers')
         question = r.get('question')
         question_auxiliary = r.get('questionAuxiliary')
         vm_subject_prefix = r.get('verbModifiersSubjectPrefix')
-        type_ = utils.deep_get(r, 'subject', 'type')
+        type_ = SUBJECT_TYPE.get(r)
         subject = (
             Entity.from_json(r['subject']) if type_ == 'entity' else
-            Relation.from_json(r['subject']) if type_ == 'relation' else None)
+            _build_child(Relation, r['subject'], built, depth)
+            if type_ == 'relation' else None)
         predicate = Predicate.from_json(r.get('predicate'))
-        type_ = utils.deep_get(r, 'object', 'type')
+        type_ = OBJECT_TYPE.get(r)
         object_ = (
             Entity.from_json(r['object']) if type_ == 'entity' else
-            Relation.from_json(r['object']) if type_ == 'relation' else None)
+            _build_child(Relation, r['object'], built, depth)
+            if type_ == 'relation' else None)
         vm_object_suffix = r.get('verbModifiersObjectSuffix')
-        prepositions = [Preposition.from_json(p)
+        prepositions = [_build_child(Preposition, p, built, depth)
                         for p in r.get('prepositions', [])
                         if p.get('type') == 'preposition']
-        type_ = utils.deep_get(r, 'qualified_object', 'type')
+        type_ = QUALIFIED_OBJECT_TYPE.get(r)
         qualified_object = (
-            Entity.from_json(
-                r['qualified_object']) if type_ == 'entity' else Relation.from_json(  # noqa
-                r['qualified_object']) if type_ == 'relation' else None)
+            Entity.from_json(r['qualified_object']) if type_ == 'entity' else
+            _build_child(Relation, r['qualified_object'], built, depth)
+            if type_ == 'relation' else None)
         inferred = r.get('inferred', False)
         nested = r.get('nested', False)
         qualified = r.get('qualified', False)
@@ -541,38 +1422,25 @@ class Relation(object):
     def get_entities(self, ner_only=False):
         """Gets the entities of a `Relation`.
 
-        Gets the named entities from a relation by cycling through
-        the subjects and objects deeply.
+        Gets the named entities from a relation by going through its
+        subjects, objects, prepositions and qualified objects deeply (see
+        `get_entities()`). When several entities share an index, the first
+        one found is kept.
         :param ner_only: Only entities with NER values, defaults to False
         :type ner_only: bool, optional
         :returns: A dict of entities found in the Relation by their index
         :rtype: {dict}
         """
-        def get_entities_helper(x, entities={}):
-            """Gets the entities in a subject or object.
+        return get_entities([self], ner_only)
 
-            :param x: Relation's subject or object
-            :type x: Entity or Relation
-            :param entities: The cumulative entities found, defaults to {}
-            :type entities: dict, optional
-            """
-            if isinstance(x, Entity):
-                if not ner_only or (ner_only and x.ner):
-                    if x.index not in entities:
-                        values = {}
-                        values['index'] = x.index
-                        values['entity'] = x.entity
-                        if x.ner:
-                            values['ner'] = x.ner
-                        entities[x.index] = values
-            elif isinstance(x, Relation):
-                get_entities_helper(x.subject, entities)
-                get_entities_helper(x.object, entities)
-                for preposition in x.prepositions:
-                    get_entities_helper(preposition.preposition_object)
-            return entities
-        entities = get_entities_helper(self)
-        return entities
+    def walk(self):
+        """Walks every node of the `Relation`, itself included.
+
+        See `walk()`.
+        :returns: The nodes of the `Relation`
+        :rtype: {generator}
+        """
+        return walk([self])
 
 
 class Entity(object):
@@ -580,6 +1448,10 @@ class Entity(object):
     Core API call. An `Entity` holds information for subjects
     and objects.
     """
+    __slots__ = (
+        'possessive_entity', 'possessive_suffix', 'determiner',
+        'entity_modifiers_prefix', 'entity', 'entity_modifiers_suffix',
+        'index', 'person', 'proper_noun', 'ner')
 
     def __init__(
             self,
@@ -662,6 +1534,10 @@ class Predicate(object):
     """Holds the `Predicate` data within a `Relation` from a
     Core API call. A `Predicate` holds information for verbs.
     """
+    __slots__ = (
+        'verb_modifiers_prefix', 'verb_prefix', 'verb', 'verb_suffix',
+        'verb_modifiers_suffix', 'index', 'negated', 'tense', 'conjugation',
+        'auxiliary_qualifier', 'phrasal_particle')
 
     def __init__(
             self,
@@ -743,6 +1619,9 @@ class Preposition(object):
     """Holds the `Preposition` data within a `Relation` from a
     Core API call.
     """
+    __slots__ = (
+        'preposition_prefix', 'preposition', 'preposition_object',
+        'nested_prepositions', 'index', 'preposition_type')
 
     def __init__(
             self,
@@ -785,18 +1664,26 @@ class Preposition(object):
 
     @classmethod
     def from_json(cls, p):
-        """Builds a `Predicate` from a json object."""
+        """Builds a `Preposition` from a json object.
+
+        See `Relation.from_json()`.
+        """
+        return cls._from_json(p)
+
+    @classmethod
+    def _from_json(cls, p, top_level=False, built=None, depth=0):
+        """Builds a `Preposition`; see `Relation._from_json()`."""
         preposition_prefix = p.get('preposition_prefix', [])
         preposition = p.get('preposition')
-        type_ = utils.deep_get(p, 'prepositionObject', 'type')
+        type_ = PREPOSITION_OBJECT_TYPE.get(p)
         preposition_object = (
             Entity.from_json(p['prepositionObject']) if type_ == 'entity' else
-            Relation.from_json(p['prepositionObject']) if type_ == 'relation'
-            else None)
+            _build_child(Relation, p['prepositionObject'], built, depth)
+            if type_ == 'relation' else None)
         nested_prepositions = [
-            Preposition.from_json(np) for np in p.get(
-                'nestedPrepositions',
-                []) if np.get('type') == 'preposition']
+            _build_child(Preposition, np, built, depth)
+            for np in p.get('nestedPrepositions', [])
+            if np.get('type') == 'preposition']
         index = p.get('index')
         preposition_type = p.get('preposition_type', None)
         return cls(preposition_prefix,
@@ -811,6 +1698,7 @@ class Concept(object):
     """Holds the `Concept` data within an `Entity` from a
     Core API call.
     """
+    __slots__ = ('id_', 'label', 'freebase_id')
 
     def __init__(self, id_, label, freebase_id):
         self.id_ = id_
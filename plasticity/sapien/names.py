@@ -2,8 +2,17 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-from plasticity.utils import utils
+import json
+import os
+from array import array
+from collections import namedtuple
+
+import six
+
+from plasticity.utils.bloom import BloomFilter
+from plasticity.utils.table import SortedTable
 from plasticity.base.endpoint import Endpoint
+from plasticity.base.transport import RawResponse
 
 
 class Names(Endpoint):
@@ -37,6 +46,20 @@ class Names(Endpoint):
     result = plasticity.sapien.names.post('sarah')
     print(result.is_female_name)  # True
     ```
+
+
+    Local lexicon:
+
+    Once `lexicon` is set to a `NamesLexicon`, every successful `post()` is
+    added to it and every repeat is answered from it. `classify()` answers
+    a whole list of tokens, only sending the ones the lexicon doesn't know.
+
+    ```python
+    names = plasticity.sapien.names
+    names.lexicon = NamesLexicon('names.table')
+    results = names.classify(['sarah', 'the', 'sarah', 'smith'])
+    names.lexicon.save()
+    ```
     """
     NAME = 'Names'
     PARAMS = [
@@ -48,18 +71,97 @@ class Names(Endpoint):
         """Initializes a new Names Endpoint."""
         super(Names, self).__init__(plasticity)
         self.url = self.plasticity.sapien.url + 'names/'
+        self.lexicon = None
+
+    def _lexicon_response(self, data, payload):
+        """Builds a `Names.Response` for data from the lexicon."""
+        return self._build_response(
+            RawResponse(200, None), payload,
+            decoded={'data': data, 'error': False})
+
+    def post(self, *args, **kwargs):
+        lexicon = self.lexicon
+        if lexicon is None:
+            return self._request('POST', *args, **kwargs)
+        payload = self.get_payload_from_args(args, kwargs)
+        name = payload.get('name')
+        if not isinstance(name, six.string_types):
+            # Only the API can answer (with an error) a missing name
+            return self._request('POST', payload)
+        data = lexicon.get(name)
+        if data is not None:
+            return self._lexicon_response(data, payload)
+        result = self._request('POST', payload)
+        if not result.error:
+            lexicon.add(name, result.data)
+        return result
+
+    def classify(self, names, workers=None):
+        """Classifies a list of names (or tokens).
+
+        The names the `lexicon` knows are answered from it. The other
+        distinct names are sent once each, concurrently (see
+        `post_many()`), and added to it. A `lexicon` is created in memory
+        if there isn't one yet.
+        :param names: The names to classify
+        :type names: list
+        :param workers: The number of concurrent requests, defaults to the
+                        transport's `pool_maxsize`
+        :type workers: int, optional
+        :returns: A `Names.Response` (or `BatchError`) for each name, in
+                  order
+        :rtype: {list}
+        """
+        if self.lexicon is None:
+            self.lexicon = NamesLexicon()
+        lexicon = self.lexicon
+        results = [None] * len(names)
+        # The names to send, and the positions each one answers
+        payloads, positions, unknown = [], [], {}
+        for i, name in enumerate(names):
+            if not isinstance(name, six.string_types):
+                payloads.append({'name': name})
+                positions.append([i])
+                continue
+            data = lexicon.get(name)
+            if data is not None:
+                results[i] = self._lexicon_response(data, {'name': name})
+                continue
+            if name not in unknown:
+                unknown[name] = len(payloads)
+                payloads.append({'name': name})
+                positions.append([])
+            positions[unknown[name]].append(i)
+        for payload, indices, result in zip(
+                payloads, positions,
+                self.post_many(payloads, workers=workers)):
+            if (isinstance(payload['name'], six.string_types) and
+                    not result.error):
+                lexicon.add(payload['name'], result.data)
+            for i in indices:
+                results[i] = result
+        return results
 
     class Response(Endpoint.Response):
+        def __init__(self, response, *args, **kwargs):
+            super(Names.Response, self).__init__(response, *args, **kwargs)
+            self._record = None
+
+        @property
+        def record(self):
+            """The `NameRecord` of `data`, decoded on first access."""
+            if self._record is None:
+                self._record = NameRecord.from_data(self.data)
+            return self._record
+
         def is_male_name(self):
             """Checks if a name is male, with certainty.
 
             :returns: Whether the name is male
             :rtype: {bool}
             """
-            is_male = utils.deep_get(self.data, 'isMaleName', 'value')
-            is_certain = utils.deep_get(
-                self.data, 'isMaleName', 'confidence') == 'Certain'
-            return is_male and is_certain
+            r = self.record
+            return r.male and r.male_confidence == CERTAIN
 
         def is_female_name(self):
             """Checks if a name is female, with certainty.
@@ -67,10 +169,8 @@ class Names(Endpoint):
             :returns: Whether the name is female
             :rtype: {bool}
             """
-            is_female = utils.deep_get(self.data, 'isFemaleName', 'value')
-            is_certain = utils.deep_get(
-                self.data, 'isFemaleName', 'confidence') == 'Certain'
-            return is_female and is_certain
+            r = self.record
+            return r.female and r.female_confidence == CERTAIN
 
         def is_first_name(self):
             """Checks if a name is a first name, with certainty.
@@ -78,13 +178,9 @@ class Names(Endpoint):
             :returns: Whether the name is a first name
             :rtype: {bool}
             """
-            is_male = utils.deep_get(self.data, 'isMaleName', 'value')
-            is_m_certain = utils.deep_get(
-                self.data, 'isMaleName', 'confidence') == 'Certain'
-            is_female = utils.deep_get(self.data, 'isFemaleName', 'value')
-            is_f_certain = utils.deep_get(
-                self.data, 'isFemaleName', 'confidence') == 'Certain'
-            return (is_male and is_m_certain) or (is_female and is_f_certain)
+            r = self.record
+            return ((r.male and r.male_confidence == CERTAIN) or
+                    (r.female and r.female_confidence == CERTAIN))
 
         def is_family_name(self):
             """Checks if a name is a family name, with certainty.
@@ -92,10 +188,8 @@ class Names(Endpoint):
             :returns: Whether the name is a family name
             :rtype: {bool}
             """
-            is_family_name = utils.deep_get(self.data, 'isFamilyName', 'value')
-            is_certain = utils.deep_get(
-                self.data, 'isFamilyName', 'confidence') == 'Certain'
-            return is_family_name and is_certain
+            r = self.record
+            return r.family and r.family_confidence == CERTAIN
 
         def is_name(self):
             """Checks if the text supplied is a name, with certainty.
@@ -103,7 +197,253 @@ class Names(Endpoint):
             :returns: Whether the text is a name
             :rtype: {bool}
             """
-            is_name = utils.deep_get(self.data, 'isName', 'value')
-            is_certain = utils.deep_get(
-                self.data, 'isName', 'confidence') == 'Certain'
-            return is_name and is_certain
+            r = self.record
+            return r.name and r.name_confidence == CERTAIN
+
+
+CERTAIN = 'Certain'
+
+
+class NameRecord(namedtuple('NameRecord', [
+        'name', 'name_confidence', 'male', 'male_confidence', 'female',
+        'female_confidence', 'family', 'family_confidence'])):
+    """Holds the values and confidences of the `data` of a
+    `Names.Response`.
+
+    `name`, `male`, `female` and `family` are the `isName`, `isMaleName`,
+    `isFemaleName` and `isFamilyName` values, and each has a confidence
+    (e.g. 'Certain'). A missing value or confidence is `None`.
+    """
+    __slots__ = ()
+
+    FIELDS = ('isName', 'isMaleName', 'isFemaleName', 'isFamilyName')
+
+    @classmethod
+    def from_data(cls, data):
+        """Builds a `NameRecord` from the `data` of a `Names.Response`."""
+        values = []
+        for field in cls.FIELDS:
+            f = data.get(field) if isinstance(data, dict) else None
+            if isinstance(f, dict):
+                values.append(f.get('value'))
+                values.append(f.get('confidence'))
+            else:
+                values.extend((None, None))
+        return cls._make(values)
+
+
+class NameFlags(object):
+    """Holds the `is_*` predicates of a batch of `Names.Response`s as
+    parallel `array`s of 0/1 bytes, with one item per response.
+    """
+    __slots__ = ('is_name', 'is_male_name', 'is_female_name',
+                 'is_first_name', 'is_family_name')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, array('B'))
+
+    def __repr__(self):
+        return '<NameFlags {}>'.format(id(self))
+
+    def __len__(self):
+        return len(self.is_name)
+
+    def to_numpy(self):
+        """Exports the flags as NumPy boolean arrays (no copy).
+
+        Requires the `numpy` package.
+        :returns: The flags by predicate name
+        :rtype: {dict}
+        """
+        import numpy as np
+        return dict((name, np.frombuffer(getattr(self, name), dtype=bool))
+                    for name in self.__slots__)
+
+
+def classify_many(responses):
+    """Evaluates every `is_*` predicate over a batch of responses at once.
+
+    Errors (including `BatchError`s) get all flags unset.
+    :param responses: The `Names.Response`s
+    :type responses: iterable
+    :returns: The flags of every response
+    :rtype: {NameFlags}
+    """
+    flags = NameFlags()
+    name, male, female = flags.is_name, flags.is_male_name, \
+        flags.is_female_name
+    first, family = flags.is_first_name, flags.is_family_name
+    for response in responses:
+        r = (NameRecord.from_data(None) if response.error
+             else response.record)
+        is_male = bool(r.male) and r.male_confidence == CERTAIN
+        is_female = bool(r.female) and r.female_confidence == CERTAIN
+        name.append(bool(r.name) and r.name_confidence == CERTAIN)
+        male.append(is_male)
+        female.append(is_female)
+        first.append(is_male or is_female)
+        family.append(bool(r.family) and r.family_confidence == CERTAIN)
+    return flags
+
+
+class NamesLexicon(object):
+    """A NamesLexicon holds `Names` results by name.
+
+    Names are kept as compact records of the `isName`, `isMaleName`,
+    `isFemaleName` and `isFamilyName` values and confidences. Tokens that
+    are none of those (most tokens of a text) are only added to a
+    `BloomFilter`, which holds millions of them in a few MB. A token found
+    in the filter is answered as a non-name without a network call, so a
+    real name is wrongly taken for a non-name with a probability of about
+    `error_rate`.
+
+    The lexicon is saved as a memory-mapped `SortedTable` file, with the
+    filter stored in it.
+
+    Attributes:
+        path: The path of the table file, or `None`
+        bloom: The `BloomFilter` of known non-names
+    """
+
+    FIELDS = NameRecord.FIELDS
+    BLOOM_KEY = b'\x00bloom'
+    CONFIDENCES_KEY = b'\x00confidences'
+
+    def __init__(self, path=None, capacity=1000000, error_rate=0.0001):
+        """Initializes a new NamesLexicon.
+
+        :param path: The table file to load (if it exists) and save to,
+                     defaults to None (in memory only)
+        :type path: str, optional
+        :param capacity: The number of non-names to size the filter for
+                         (about 2.4 MB per million at the default error
+                         rate), defaults to 1000000
+        :type capacity: int, optional
+        :param error_rate: The rate of unknown tokens wrongly answered as
+                           non-names, defaults to 0.0001
+        :type error_rate: float, optional
+        """
+        self.path = path
+        self._table = None
+        self._entries = {}
+        self._confidences = []
+        if path is not None and os.path.exists(path):
+            self._table = SortedTable(path)
+            self.bloom = BloomFilter.from_bytes(
+                self._table.get(self.BLOOM_KEY))
+            self._confidences = json.loads(
+                self._table.get(self.CONFIDENCES_KEY).decode('utf-8'))
+        else:
+            self.bloom = BloomFilter(capacity, error_rate)
+        self._confidence_ids = dict(
+            (c, i) for i, c in enumerate(self._confidences))
+
+    def __len__(self):
+        """The number of names (not non-names) held."""
+        if self._table is None:
+            return len(self._entries)
+        return len(self._table) - 2 + sum(
+            1 for k in self._entries if k not in self._table)
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    @staticmethod
+    def get_key(name):
+        return name.encode('utf-8')
+
+    def _pack(self, data):
+        """Packs Names data into a record of 2 bytes per field: the value
+        (0 for False, 1 for True, 2 for missing) and the confidence id
+        (0 for missing).
+        """
+        record = bytearray()
+        for field in self.FIELDS:
+            f = data.get(field) or {}
+            value = f.get('value')
+            record.append(2 if value is None else int(bool(value)))
+            confidence = f.get('confidence')
+            if confidence is None:
+                record.append(0)
+                continue
+            i = self._confidence_ids.get(confidence)
+            if i is None:
+                i = self._confidence_ids[confidence] = len(self._confidences)
+                self._confidences.append(confidence)
+            record.append(i + 1)
+        return bytes(record)
+
+    def _unpack(self, record):
+        """Unpacks a record into Names data."""
+        record = bytearray(record)
+        data = {}
+        for i, field in enumerate(self.FIELDS):
+            value, confidence = record[2 * i], record[2 * i + 1]
+            data[field] = {
+                'value': None if value == 2 else bool(value),
+                'confidence': (self._confidences[confidence - 1]
+                               if confidence else None),
+            }
+        return data
+
+    def get(self, name):
+        """Gets the Names data of a name.
+
+        :param name: The name
+        :type name: str
+        :returns: The data, like `Names.Response.data`, or `None` if the
+                  name is unknown. A known non-name has every value False
+                  and no confidences.
+        :rtype: {dict|None}
+        """
+        key = self.get_key(name)
+        record = self._entries.get(key)
+        if record is None and self._table is not None:
+            record = self._table.get(key)
+        if record is not None:
+            return self._unpack(record)
+        if name in self.bloom:
+            return dict((field, {'value': False, 'confidence': None})
+                        for field in self.FIELDS)
+        return None
+
+    def add(self, name, data):
+        """Adds the Names data of a name.
+
+        :param name: The name
+        :type name: str
+        :param data: The data of a `Names.Response`
+        :type data: dict
+        """
+        if not any((data.get(field) or {}).get('value')
+                   for field in self.FIELDS):
+            self.bloom.add(name)
+        else:
+            self._entries[self.get_key(name)] = self._pack(data)
+
+    def save(self, path=None):
+        """Saves the lexicon as a table file, and maps it.
+
+        :param path: The path to save to, defaults to `path`
+        :type path: str, optional
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError('The lexicon has no path to save to.')
+        items = dict(self._table.items()) if self._table is not None else {}
+        items.update(self._entries)
+        items[self.BLOOM_KEY] = self.bloom.to_bytes()
+        items[self.CONFIDENCES_KEY] = json.dumps(
+            self._confidences).encode('utf-8')
+        SortedTable.write(path, items.items())
+        self.close()
+        self.path = path
+        self._table = SortedTable(path)
+        self._entries = {}
+
+    def close(self):
+        """Unmaps the table file."""
+        if self._table is not None:
+            self._table.close()
+            self._table = None
@@ -2,7 +2,15 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import io
+import json
+import os
+
 from plasticity.base.endpoint import Endpoint
+from plasticity.base.transport import RawResponse
+from plasticity.utils.table import SortedTable
+
+MISSING = object()
 
 
 class Transform(Endpoint):
@@ -37,6 +45,21 @@ class Transform(Endpoint):
     result = plasticity.sapien.transform.post('eating', 'VerbPast')
     print(result.data)  # ate
     ```
+
+
+    Local store:
+
+    Transforms never change, so they can be answered from a local
+    `TransformStore` without a network round-trip. Once `store` is set,
+    every successful `post()` is added to it and every repeat is answered
+    from it. `warm()` fills it in bulk with concurrent requests.
+
+    ```python
+    transform = plasticity.sapien.transform
+    transform.store = TransformStore('transforms.table')
+    transform.warm(['leaf', 'eat'], ['NounPlural', 'VerbPast'])
+    transform.store.save()
+    ```
     """
     NAME = 'Transform'
     PARAMS = [
@@ -49,3 +72,187 @@ class Transform(Endpoint):
         """Initializes a new Transform Endpoint."""
         super(Transform, self).__init__(plasticity)
         self.url = self.plasticity.sapien.url + 'transform/'
+        self.store = None
+
+    def post(self, *args, **kwargs):
+        store = self.store
+        if store is None:
+            return self._request('POST', *args, **kwargs)
+        payload = self.get_payload_from_args(args, kwargs)
+        word, action = payload.get('word'), payload.get('action')
+        data = store.get(word, action, MISSING)
+        if data is not MISSING:
+            return self._build_response(
+                RawResponse(200, None), payload,
+                decoded={'data': data, 'error': False})
+        result = self._request('POST', payload)
+        if not result.error:
+            store.set(word, action, result.data)
+        return result
+
+    def warm(self, vocabulary, actions, workers=None):
+        """Fills the `store` with every action applied to every word.
+
+        Only the distinct pairs missing from the store are requested, once
+        each and concurrently (see `post_many()`). Pairs whose request fails
+        are left out, so calling `warm()` again retries just those. A `store`
+        is created in memory if there isn't one yet.
+        :param vocabulary: The words to transform
+        :type vocabulary: iterable
+        :param actions: The actions to apply to each word
+        :type actions: list
+        :param workers: The number of concurrent requests, defaults to the
+                        transport's `pool_maxsize`
+        :type workers: int, optional
+        :returns: The number of transforms added to the store
+        :rtype: {int}
+        """
+        if self.store is None:
+            self.store = TransformStore()
+        store = self.store
+
+        def payloads():
+            seen = set()
+            for word in vocabulary:
+                for action in actions:
+                    key = (word, action)
+                    if key not in seen and key not in store:
+                        seen.add(key)
+                        yield {'word': word, 'action': action}
+
+        added = 0
+        for result in self.post_many(payloads(), workers=workers):
+            if not result.error:
+                store.set(result.request['word'], result.request['action'],
+                          result.data)
+                added += 1
+        return added
+
+
+class TransformStore(object):
+    """A TransformStore holds Transform results by word and action.
+
+    It is saved as a `SortedTable` file, which is memory-mapped rather than
+    read when the store is opened, so a store of any size opens instantly
+    and a lookup is a binary search over the mapped file. New results are
+    held in memory until `save()` merges them into the file.
+
+    Attributes:
+        path: The path of the table file, or `None`
+    """
+
+    def __init__(self, path=None):
+        """Initializes a new TransformStore.
+
+        :param path: The table file to load (if it exists) and save to,
+                     defaults to None (in memory only)
+        :type path: str, optional
+        """
+        self.path = path
+        self._table = None
+        self._entries = {}
+        if path is not None and os.path.exists(path):
+            self._table = SortedTable(path)
+
+    @staticmethod
+    def get_key(word, action):
+        """Gets the table key of a word and action."""
+        return u'{}\x00{}'.format(word, action).encode('utf-8')
+
+    def __len__(self):
+        if self._table is None:
+            return len(self._entries)
+        return len(self._table) + sum(
+            1 for k in self._entries if k not in self._table)
+
+    def __contains__(self, pair):
+        key = self.get_key(*pair)
+        return key in self._entries or (
+            self._table is not None and key in self._table)
+
+    def get(self, word, action, default=None):
+        """Gets the result of a transform.
+
+        :param word: The word
+        :type word: str
+        :param action: The transform action (e.g. 'NounPlural')
+        :type action: str
+        :param default: The value returned for a missing transform,
+                        defaults to None
+        :type default: any, optional
+        :returns: The transformed word, or `default`
+        :rtype: {str|any}
+        """
+        key = self.get_key(word, action)
+        data = self._entries.get(key, MISSING)
+        if data is not MISSING:
+            return data
+        if self._table is not None:
+            value = self._table.get(key)
+            if value is not None:
+                return json.loads(value.decode('utf-8'))
+        return default
+
+    def set(self, word, action, data):
+        """Adds the result of a transform."""
+        self._entries[self.get_key(word, action)] = data
+
+    def update(self, transforms):
+        """Adds transform results in bulk.
+
+        :param transforms: The (word, action, result) triples
+        :type transforms: iterable
+        """
+        for word, action, data in transforms:
+            self.set(word, action, data)
+
+    def load_tsv(self, path):
+        """Adds the transform results of a TSV file with one
+        word, action and result per line. Blank lines are skipped.
+
+        :param path: The path of the TSV file
+        :type path: str
+        :raises ValueError: If a line doesn't have all three fields
+        """
+        with io.open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                fields = line.rstrip('\r\n').split('\t', 2)
+                if len(fields) < 3:
+                    raise ValueError(
+                        'Line {} of {} should have a word, action and result '
+                        'separated by tabs.'.format(number, path))
+                self.set(*fields)
+
+    def items(self):
+        """Iterates over the (key, result) pairs of the store."""
+        if self._table is not None:
+            for key, value in self._table.items():
+                if key not in self._entries:
+                    yield key, json.loads(value.decode('utf-8'))
+        for item in self._entries.items():
+            yield item
+
+    def save(self, path=None):
+        """Saves the store as a table file, and maps it.
+
+        :param path: The path to save to, defaults to `path`
+        :type path: str, optional
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError('The store has no path to save to.')
+        SortedTable.write(path, (
+            (key, json.dumps(data).encode('utf-8'))
+            for key, data in self.items()))
+        self.close()
+        self.path = path
+        self._table = SortedTable(path)
+        self._entries = {}
+
+    def close(self):
+        """Unmaps the table file."""
+        if self._table is not None:
+            self._table.close()
+            self._table = None
@@ -0,0 +1,87 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import hashlib
+import math
+import struct
+
+
+class BloomFilter(object):
+    """A BloomFilter is a compact set of strings that can answer
+    "definitely not added" or "probably added".
+
+    A string that was added is always found. A string that wasn't is
+    wrongly found with a probability of about `error_rate`, as long as no
+    more than `capacity` strings are added.
+
+    Attributes:
+        capacity: The number of strings the filter is sized for
+        error_rate: The target false positive rate at `capacity`
+        size: The number of bits in the filter
+        hashes: The number of bits set per string
+        count: The number of strings added
+    """
+
+    HEADER = struct.Struct('<IIId')
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        """Initializes a new, empty BloomFilter.
+
+        :param capacity: The number of strings to size the filter for,
+                         defaults to 100000
+        :type capacity: int, optional
+        :param error_rate: The target false positive rate, defaults to 0.001
+        :type error_rate: float, optional
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(
+            self.size / capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, string):
+        # Double hashing: the i-th bit is h1 + i * h2 (Kirsch-Mitzenmacher)
+        digest = hashlib.md5(string.encode('utf-8')).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, string):
+        """Adds a string to the filter."""
+        bits = self._bits
+        for position in self._positions(string):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, string):
+        bits = self._bits
+        for position in self._positions(string):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def to_bytes(self):
+        """Serializes the filter."""
+        return self.HEADER.pack(self.size, self.hashes, self.count,
+                                self.error_rate) + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Deserializes a filter from `to_bytes()`."""
+        size, hashes, count, error_rate = cls.HEADER.unpack_from(data, 0)
+        bloom = cls.__new__(cls)
+        bloom.size = size
+        bloom.hashes = hashes
+        bloom.count = count
+        bloom.error_rate = error_rate
+        bloom.capacity = int(round(
+            size * math.log(2) ** 2 / -math.log(error_rate)))
+        bloom._bits = bytearray(data[cls.HEADER.size:])
+        return bloom
@@ -0,0 +1,91 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import sys
+
+import six
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JSONCodec(object):
+    """Encodes requests and decodes responses with the standard `json`
+    module.
+
+    Codecs encode to `bytes` and decode straight from the `bytes` of a
+    response body, so a body never has to be decoded to text first.
+    """
+    name = 'json'
+
+    def dumps(self, obj):
+        """Encodes an object to JSON bytes."""
+        return json.dumps(obj).encode('utf-8')
+
+    def loads(self, data):
+        """Decodes JSON bytes (or text) to an object."""
+        if isinstance(data, bytes) and sys.version_info[:2] < (3, 6):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+
+class UJSONCodec(JSONCodec):
+    """Encodes and decodes JSON with the `ujson` package."""
+    name = 'ujson'
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+class ORJSONCodec(JSONCodec):
+    """Encodes and decodes JSON with the `orjson` package."""
+    name = 'orjson'
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+CODECS = [
+    (ORJSONCodec, orjson),
+    (UJSONCodec, ujson),
+    (JSONCodec, json),
+]
+
+
+def get_codec(codec=None):
+    """Gets a JSON codec.
+
+    :param codec: A codec, the name of one ('orjson', 'ujson' or 'json'),
+                  or None for the fastest one installed, defaults to None
+    :type codec: JSONCodec|str, optional
+    :returns: The codec
+    :rtype: {JSONCodec}
+    :raises ValueError: If the named codec's package isn't installed
+    """
+    if codec is not None and not isinstance(codec, six.string_types):
+        return codec
+    for cls, module in CODECS:
+        if codec is None and module is not None or codec == cls.name:
+            if module is None:
+                raise ValueError(
+                    'The `{}` package is not installed.'.format(codec))
+            return cls()
+    raise ValueError('Unknown JSON codec: {}.'.format(codec))
+
+
+default_codec = get_codec()
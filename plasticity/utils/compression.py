@@ -0,0 +1,129 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import zlib
+
+import six
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class GzipCompressor(object):
+    """Compresses request bodies with gzip.
+
+    Compressors are named after the `Content-Encoding` they produce.
+    """
+    name = 'gzip'
+    wbits = 16 + zlib.MAX_WBITS
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        """Compresses bytes."""
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, self.wbits)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data):
+        """Decompresses bytes."""
+        return zlib.decompress(data, self.wbits)
+
+
+class DeflateCompressor(GzipCompressor):
+    """Compresses request bodies with deflate (zlib)."""
+    name = 'deflate'
+    wbits = zlib.MAX_WBITS
+
+
+class BrotliCompressor(GzipCompressor):
+    """Compresses request bodies with the `brotli` package."""
+    name = 'br'
+
+    def __init__(self, level=4):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def decompress(self, data):
+        return brotli.decompress(data)
+
+
+class ZstdCompressor(GzipCompressor):
+    """Compresses request bodies with the `zstandard` package."""
+    name = 'zstd'
+
+    def __init__(self, level=3):
+        self.level = level
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def decompress(self, data):
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+COMPRESSORS = [
+    (ZstdCompressor, zstandard),
+    (BrotliCompressor, brotli),
+    (GzipCompressor, zlib),
+    (DeflateCompressor, zlib),
+]
+
+
+def get_compressor(compressor=None):
+    """Gets a request body compressor.
+
+    :param compressor: A compressor, the name of one ('zstd', 'br', 'gzip'
+                       or 'deflate'), or None for no compression, defaults
+                       to None
+    :type compressor: GzipCompressor|str, optional
+    :returns: The compressor, or `None`
+    :rtype: {GzipCompressor|None}
+    :raises ValueError: If the named compressor's package isn't installed
+    """
+    if compressor is None or not isinstance(compressor, six.string_types):
+        return compressor
+    for cls, module in COMPRESSORS:
+        if compressor == cls.name:
+            if module is None:
+                raise ValueError(
+                    'The package for `{}` is not installed.'.format(
+                        compressor))
+            return cls()
+    raise ValueError('Unknown compression: {}.'.format(compressor))
+
+
+def get_compressor_for(encoding):
+    """Gets the compressor for a `Content-Encoding`, if it is installed.
+
+    :param encoding: The content encoding (e.g. 'gzip')
+    :type encoding: str
+    :returns: The compressor, or `None` for an unknown encoding
+    :rtype: {GzipCompressor|None}
+    """
+    for cls, module in COMPRESSORS:
+        if encoding == cls.name and module is not None:
+            return cls()
+    return None
+
+
+def get_accept_encoding():
+    """Gets an `Accept-Encoding` header value with every encoding the
+    installed packages can decode (gzip and deflate, plus br and zstd when
+    `brotli` and `zstandard` are installed).
+
+    :returns: The comma-separated encodings
+    :rtype: {str}
+    """
+    return ', '.join(cls.name for cls, module in COMPRESSORS
+                     if module is not None)
@@ -0,0 +1,136 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import mmap
+import os
+import struct
+
+from plasticity.utils import utils
+
+
+class SortedTable(object):
+    """A SortedTable is an immutable, memory-mapped file of `bytes` keys
+    to `bytes` values, looked up by binary search.
+
+    The file is a header (magic, version and count), then the `count + 1`
+    offsets of the keys, then the `count + 1` offsets of the values, then
+    all the keys in sorted order and all the values in the same order.
+    Every integer is a little-endian uint32. Opening a table only maps the
+    file, so it costs the same for any size, and several processes mapping
+    the same file share its pages.
+
+    Attributes:
+        path: The path of the table file
+    """
+
+    MAGIC = b'PLTB'
+    VERSION = 1
+    HEADER = struct.Struct('<4sII')
+    OFFSET = struct.Struct('<I')
+
+    def __init__(self, path):
+        """Opens a SortedTable file.
+
+        :param path: The path of a file written by `SortedTable.write()`
+        :type path: str
+        :raises ValueError: If the file isn't a SortedTable
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = self.HEADER.unpack(
+            self._map[:self.HEADER.size].ljust(self.HEADER.size, b'\0'))
+        if magic != self.MAGIC or version != self.VERSION:
+            self._map.close()
+            raise ValueError('{} is not a version {} table.'.format(
+                path, self.VERSION))
+        self._count = count
+        self._key_offsets = self.HEADER.size
+        self._value_offsets = self._key_offsets + (count + 1) * 4
+        self._keys = self._value_offsets + (count + 1) * 4
+        self._values = self._keys + self._offset(self._key_offsets, count)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def _offset(self, base, i):
+        return self.OFFSET.unpack_from(self._map, base + i * 4)[0]
+
+    def _key(self, i):
+        start = self._keys + self._offset(self._key_offsets, i)
+        return self._map[start:self._keys + self._offset(
+            self._key_offsets, i + 1)]
+
+    def _value(self, i):
+        start = self._values + self._offset(self._value_offsets, i)
+        return self._map[start:self._values + self._offset(
+            self._value_offsets, i + 1)]
+
+    def _find(self, key):
+        """Gets the index of a key, or `None` if it isn't in the table."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key(lo) == key:
+            return lo
+        return None
+
+    def get(self, key, default=None):
+        """Gets the value of a key.
+
+        :param key: The key
+        :type key: bytes
+        :param default: The value returned for a missing key, defaults to
+                        None
+        :type default: any, optional
+        :returns: The value of the key, or `default`
+        :rtype: {bytes|any}
+        """
+        i = self._find(key)
+        return default if i is None else self._value(i)
+
+    def items(self):
+        """Iterates over the (key, value) pairs in key order."""
+        for i in range(self._count):
+            yield self._key(i), self._value(i)
+
+    def close(self):
+        """Unmaps the file."""
+        self._map.close()
+
+    @classmethod
+    def write(cls, path, items):
+        """Writes (key, value) pairs to a new table file.
+
+        The file is written next to `path` and then moved over it, so a
+        table open at `path` (even in another process) stays valid.
+        :param path: The path of the table file
+        :type path: str
+        :param items: The (key, value) pairs; the last value of a repeated
+                      key wins
+        :type items: iterable
+        """
+        items = sorted(dict(items).items())
+        key_offsets, value_offsets = [0], [0]
+        for key, value in items:
+            key_offsets.append(key_offsets[-1] + len(key))
+            value_offsets.append(value_offsets[-1] + len(value))
+        offsets = struct.Struct('<{}I'.format(len(items) + 1))
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(items)))
+            f.write(offsets.pack(*key_offsets))
+            f.write(offsets.pack(*value_offsets))
+            for key, _ in items:
+                f.write(key)
+            for _, value in items:
+                f.write(value)
+        utils.replace(tmp, path)
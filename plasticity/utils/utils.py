@@ -2,8 +2,13 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import os
 import textwrap
-from functools import reduce
+
+try:
+    replace = os.replace
+except AttributeError:  # function wasn't added until Python 3.3
+    replace = os.rename
 
 
 def deep_get(dictionary, *keys):
@@ -18,9 +23,62 @@ def deep_get(dictionary, *keys):
     :returns: The value at the key sequence or `None`
     :rtype: {any}
     """
-    return reduce(lambda d, key:
-                  d.get(key, None) if isinstance(d, dict) else None,
-                  keys, dictionary)
+    for key in keys:
+        if not isinstance(dictionary, dict):
+            return None
+        dictionary = dictionary.get(key)
+    return dictionary
+
+
+class KeyPath(object):
+    """A KeyPath is a key sequence compiled once and looked up in many
+    dictionaries, like `deep_get()` without unpacking the keys on every
+    call.
+
+    e.g. `KeyPath('subject', 'type').get(r)` is
+    `deep_get(r, 'subject', 'type')`. `get` is a function specialized for
+    the number of keys, so it is fastest called directly (calling the
+    KeyPath itself works too).
+
+    Attributes:
+        keys: The key sequence
+        get: Gets the key sequence from a dictionary, or `None` if it
+             doesn't exist
+    """
+    __slots__ = ('keys', 'get')
+
+    def __init__(self, *keys):
+        """Initializes a KeyPath.
+
+        :param *keys: The key sequence to get (e.g. 'foo', 'bar')
+        :type *keys: str
+        """
+        self.keys = keys
+        self.get = self._compile(keys)
+
+    @staticmethod
+    def _compile(keys):
+        if len(keys) == 1:
+            key, = keys
+
+            def get(d):
+                return d.get(key) if isinstance(d, dict) else None
+        elif len(keys) == 2:
+            first, second = keys
+
+            def get(d):
+                d = d.get(first) if isinstance(d, dict) else None
+                return d.get(second) if isinstance(d, dict) else None
+        else:
+            def get(d):
+                return deep_get(d, *keys)
+        return get
+
+    def __call__(self, dictionary):
+        return self.get(dictionary)
+
+    def __repr__(self):
+        return 'KeyPath({})'.format(', '.join(repr(k) for k in self.keys))
 
 
 def indent(text, prefix='\t'):
@@ -23,16 +23,24 @@ tests_require = [
 extras_require = {
     ':python_version<"3.0"': [
         "requests[security] >= 2.0.0",
+        "futures >= 3.0.0",
     ],
     ':python_version>="3.0"': [
         "requests >= 2.0.0",
     ],
+    'async': [
+        "aiohttp >= 3.0.0",
+    ],
+    'speedups': [
+        "orjson >= 3.0.0; python_version>='3.6'",
+        "ujson >= 1.35; python_version<'3.6'",
+    ],
     'test': tests_require,
 }
 
 setup(
     name='plasticity',
-    packages=find_packages(exclude=['tests', 'tests.*']),
+    packages=find_packages(exclude=['tests', 'tests.*', 'benchmarks']),
     version=__version__,
     description='A Python package for the Plasticity API.',
     author='Plasticity',
@@ -0,0 +1,20 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import sys
+
+import pytest
+
+from benchmarks.stub_server import StubServer
+
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_aio.py')
+
+
+@pytest.fixture
+def server():
+    """A running `StubServer` with the default canned responses."""
+    with StubServer() as server:
+        yield server
@@ -0,0 +1,44 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import asyncio
+
+import pytest
+
+from benchmarks.stub_server import StubServer
+from plasticity.aio import AsyncPlasticity
+from plasticity.sapien.core import Core
+from plasticity.sapien.names import Names
+
+pytest.importorskip('aiohttp')
+
+
+def test_async_post_returns_shared_responses(server):
+    async def run():
+        async with AsyncPlasticity('token', url=server.url) as plasticity:
+            core = await plasticity.sapien.core.post(
+                'This is an example.', graph=False, ner=False)
+            names = await plasticity.sapien.names.post('sarah')
+            return core, names
+
+    core, names = asyncio.run(run())
+    assert isinstance(core, Core.Response)
+    assert core.tokenize()[0] == 'This'
+    assert isinstance(names, Names.Response)
+    assert names.is_female_name()
+
+
+def test_async_concurrency_is_bounded():
+    async def run(server):
+        async with AsyncPlasticity(
+                'token', url=server.url, max_concurrency=8) as plasticity:
+            return await asyncio.gather(*[
+                plasticity.sapien.transform.post('leaf', 'NounPlural')
+                for _ in range(50)])
+
+    with StubServer(latency=0.02) as server:
+        results = asyncio.run(run(server))
+    assert [r.data for r in results] == ['leaves'] * 50
+    assert 1 < server.max_in_flight <= 8
@@ -0,0 +1,100 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import sqlite3
+
+import pytest
+
+from plasticity import Plasticity
+from plasticity.base.cache import DiskCache, MemoryCache
+from plasticity.base.endpoint import Endpoint
+
+
+def test_memory_cache_hits_build_fresh_responses(server):
+    cache = MemoryCache()
+    plasticity = Plasticity('token', url=server.url, cache=cache)
+    names = plasticity.sapien.names
+    first = names.post('sarah')
+    second = names.post({'name': 'sarah', 'pretty': False})
+    assert server.request_count == 1
+    assert first is not second
+    assert first.data == second.data
+    first.data['isName']['value'] = False
+    assert names.post('sarah').is_name()
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 0}
+
+
+def test_memory_cache_limits(server):
+    cache = MemoryCache(max_entries=2)
+    plasticity = Plasticity('token', url=server.url, cache=cache)
+    for word in ['a', 'b', 'c', 'a']:
+        plasticity.sapien.transform.post(word, 'NounPlural')
+    assert len(cache) == 2
+    assert cache.evictions == 2
+    assert server.request_count == 4
+
+    cache = MemoryCache(max_bytes=1)
+    plasticity = Plasticity('token', url=server.url, cache=cache)
+    plasticity.sapien.transform.post('a', 'NounPlural')
+    assert len(cache) == 0
+
+
+def test_disk_cache_survives_restarts(server, tmpdir):
+    path = str(tmpdir.join('cache.sqlite'))
+    plasticity = Plasticity('token', url=server.url, cache=DiskCache(path))
+    plasticity.sapien.transform.post('leaf', 'NounPlural')
+
+    cache = DiskCache(path, replay_only=True)
+    plasticity = Plasticity('token', url=server.url, cache=cache)
+    assert plasticity.sapien.transform.post('leaf', 'NounPlural').data == \
+        'leaves'
+    with pytest.raises(Endpoint.PlasticityCacheMissError):
+        plasticity.sapien.transform.post('leaf', 'VerbPast')
+    assert server.request_count == 1
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0}
+
+
+def test_disk_cache_limits(server, tmpdir):
+    path = str(tmpdir.join('cache.sqlite'))
+    cache = DiskCache(path, max_entries=2)
+    plasticity = Plasticity('token', url=server.url, cache=cache)
+    for word in ['a', 'b', 'c', 'a']:
+        plasticity.sapien.transform.post(word, 'NounPlural')
+    assert len(cache) == 2
+    assert cache.evictions == 2
+
+    size = cache.size // 2
+    cache = DiskCache(path, max_bytes=size)
+    plasticity = Plasticity('token', url=server.url, cache=cache)
+    plasticity.sapien.transform.post('d', 'NounPlural')
+    assert len(cache) == 1
+    assert cache.size == size
+
+
+def test_disk_cache_hits_batch_access_times(server, tmpdir):
+    path = str(tmpdir.join('cache.sqlite'))
+
+    def accessed():
+        db = sqlite3.connect(path)
+        try:
+            return db.execute('SELECT accessed FROM responses').fetchone()[0]
+        finally:
+            db.close()
+
+    cache = DiskCache(path, access_interval=3600)
+    plasticity = Plasticity('token', url=server.url, cache=cache)
+    plasticity.sapien.transform.post('leaf', 'NounPlural')
+    stored = accessed()
+    plasticity.sapien.transform.post('leaf', 'NounPlural')
+    assert accessed() == stored
+    cache.close()
+    assert accessed() > stored
+
+    stored = accessed()
+    cache = DiskCache(path, replay_only=True, access_interval=0)
+    Plasticity('token', url=server.url, cache=cache).sapien.transform.post(
+        'leaf', 'NounPlural')
+    cache.close()
+    assert accessed() == stored
@@ -0,0 +1,68 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+
+
+from plasticity import cli
+
+
+def run(server, *argv):
+    return cli.run(cli.parse_args(
+        list(argv) + ['--url', server.url, '--token', 't', '--progress', '0']))
+
+
+def read_jsonl(path):
+    with io.open(str(path), encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_cli_streams_in_order(server, tmpdir):
+    source, output = tmpdir.join('in.jsonl'), tmpdir.join('out.jsonl')
+    source.write('\n'.join([
+        json.dumps({'id': 'a', 'name': 'sarah'}), '',
+        json.dumps(['john']), json.dumps('mary')]) + '\n')
+    progress = run(server, 'names', '-i', str(source), '-o', str(output),
+                   '-p', 'pretty=false', '-w', '2')
+    records = read_jsonl(output)
+    assert [(r['id'], r['line']) for r in records] == \
+        [('a', 0), (2, 2), (3, 3)]
+    assert records[0]['response']['data']['isName']['value'] is True
+    assert progress.done == 3 and progress.errors == 0
+    assert server.request_count == 3
+
+
+def test_cli_resumes_from_checkpoint(server, tmpdir):
+    source, output = tmpdir.join('in.tsv'), tmpdir.join('out.jsonl')
+    checkpoint = tmpdir.join('ckpt')
+    source.write('leaf\tNounPlural\nleaf\tVerbPast\nleaf\tNounPlural\n')
+    output.write(json.dumps({'id': 0, 'line': 0}) + '\n')
+    checkpoint.write(json.dumps(
+        {'done': 1, 'offset': output.size(), 'completed': []}))
+    run(server, 'transform', '-i', str(source), '-o', str(output),
+        '--checkpoint', str(checkpoint), '--unordered')
+    records = read_jsonl(output)
+    assert sorted(r['line'] for r in records) == [0, 1, 2]
+    assert records[1]['response']['data'] == 'leaves'
+    assert json.loads(checkpoint.read()) == {
+        'done': 3, 'offset': output.size(), 'completed': []}
+    assert server.request_count == 2
+
+
+def test_cli_resume_drops_output_after_checkpoint(server, tmpdir):
+    source, output = tmpdir.join('in.tsv'), tmpdir.join('out.jsonl')
+    checkpoint = tmpdir.join('ckpt')
+    source.write('leaf\tNounPlural\nleaf\tVerbPast\nleaf\tNounPlural\n')
+    saved = json.dumps({'id': 0, 'line': 0}) + '\n' + \
+        json.dumps({'id': 2, 'line': 2}) + '\n'
+    # Line 1 was written after the last save, then the run crashed
+    output.write(saved + json.dumps({'id': 1, 'line': 1}) + '\n{"id"')
+    checkpoint.write(json.dumps(
+        {'done': 1, 'offset': len(saved), 'completed': [2]}))
+    run(server, 'transform', '-i', str(source), '-o', str(output),
+        '--checkpoint', str(checkpoint))
+    assert [r['line'] for r in read_jsonl(output)] == [0, 2, 1]
+    assert server.request_count == 1
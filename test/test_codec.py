@@ -0,0 +1,34 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from plasticity.base.endpoint import Endpoint
+from plasticity.base.transport import RawResponse
+from plasticity.utils import codec
+
+
+@pytest.mark.parametrize('name', [c.name for c, m in codec.CODECS if m])
+def test_codec_round_trip(name):
+    c = codec.get_codec(name)
+    assert c.name == name
+    encoded = c.dumps({'text': 'café', 'ner': False})
+    assert isinstance(encoded, bytes)
+    assert c.loads(encoded) == {'text': 'café', 'ner': False}
+
+
+def test_get_codec_errors():
+    with pytest.raises(ValueError):
+        codec.get_codec('yaml')
+
+
+def test_response_decodes_bytes_and_keeps_payload():
+    payload = {'text': 'Hello.'}
+    raw = RawResponse(200, b'{"data": 1, "error": false}<!DOCTYPE html>',
+                      body=b'{"text": "ignored"}')
+    response = Endpoint.Response(raw, request=payload)
+    assert response.data == 1
+    assert response.request is payload
+    assert Endpoint.Response(raw).request == {'text': 'ignored'}
@@ -0,0 +1,216 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from benchmarks import recorded
+from benchmarks.stub_server import StubServer
+from plasticity import Plasticity
+from plasticity.base.observer import Observer
+from plasticity.sapien.core import (
+    Core, Graph, Preposition, Relation, SentenceGroup, split_sentences)
+
+
+def core_response(payload=None):
+    return Core.Response(recorded.raw_response(
+        recorded.load('core'), payload or {'text': 'Play let it be.'}))
+
+
+def test_core_response_is_built_lazily():
+    response = core_response()
+    assert response._data is None
+    sentence_group = response.data[0]
+    assert isinstance(sentence_group, SentenceGroup)
+    assert sentence_group._alternatives is None
+    sentence = sentence_group.alternatives[0]
+    assert sentence._graph is None
+    assert isinstance(sentence.graph, Graph)
+    assert sentence.graph[0].predicate.verb == 'play'
+
+
+def test_core_response_helpers():
+    response = core_response()
+    assert response.tokenize()[1][:3] == ['Paul', 'McCartney', 'wrote']
+    assert response.parts_of_speech()[0][:2] == ['VB', 'VB']
+    assert response.lemmatize()[1][2] == 'write'
+    assert len(response.graphs()[0]) == 2
+    assert len(response.dependencies()[1]) == 12
+    ner = response.ner()
+    assert sorted(ner[0][0]) == [1, 6]
+    assert ner[1][0][1]['entity'] == 'McCartney'
+
+
+def test_relations_are_slotted_with_defaults():
+    graph = core_response().data[1].alternatives[0].graph
+    nested = graph[1].object
+    assert graph[1].top_level and graph[1].nested
+    assert not nested.top_level
+    assert (nested.inferred, nested.nested, nested.confidence) == \
+        (False, False, 1.0)
+    assert not hasattr(nested, '__dict__')
+    assert not hasattr(nested.prepositions[0].preposition_object, '__dict__')
+
+
+def test_token_columns():
+    response = core_response()
+    columns = response.columns()
+    assert columns is response.columns()
+    assert len(columns) == 28
+    assert list(columns.group_offsets) == [0, 2, 3]
+    assert list(columns.sentence_offsets) == [0, 8, 16, 28]
+    assert columns.sentence(2)[2] == ['wrote', 'VBD', 'write']
+    assert columns.strings.count('Play') == 1
+
+    np = pytest.importorskip('numpy')
+    arrays = columns.to_numpy()
+    assert arrays['tokens'].dtype == np.intc
+    assert arrays['strings'][arrays['lemmas'][18]] == 'write'
+
+
+def test_dependency_arrays():
+    response = core_response()
+    trees = response.dependency_arrays()
+    assert trees is response.dependency_arrays()
+    assert len(trees) == 28
+    assert list(trees.roots()) == [0, 0, 2]
+    assert trees.label_table[trees.labels[8 + 2]] == 'nsubj'
+    assert trees.children(2, 2) == [1, 4, 11]
+    assert trees.subtree_span(2, 4) == (3, 11)
+    assert trees.subtree_span(2, 2) == (0, 12)
+    assert trees.subtree_span(0, 5) == (5, 6)
+    assert trees.head_path(2, 10) == [10, 9, 8, 4, 2]
+    starts, ends = trees.subtree_spans()
+    assert (starts[16 + 4], ends[16 + 4]) == (16 + 3, 16 + 11)
+
+
+def test_entity_index():
+    response = core_response()
+    index = response.entity_index()
+    assert index is response.entity_index()
+    john = index.by_id['John_Lennon']
+    assert john == [(1, 0, 7)]
+    assert index.get(john[0])['entity'] == 'Lennon'
+    assert index.find(label='Person') == [(1, 0, 1), (1, 0, 7)]
+    assert index.find(label='Person', text='McCartney') == [(1, 0, 1)]
+    assert index.find(label='Nope') == []
+    assert response.ner()[1] == index.entities[1]
+    assert response.ner()[1][0] is not index.entities[1][0]
+    ner = response.ner()
+    ner[1][0][1]['entity'] = 'changed'
+    del ner[1][0][1]['ner'][:]
+    assert response.ner()[1] == index.entities[1]
+    assert index.get(index.by_text['McCartney'][0])['entity'] == 'McCartney'
+
+
+def test_get_entities_is_per_call():
+    first = core_response().ner()
+    second = core_response().ner()
+    assert [[sorted(a) for a in g] for g in first] == \
+        [[sorted(a) for a in g] for g in second]
+    beetles = second[0][1]
+    assert sorted(beetles) == [6]
+    assert beetles[6]['entity'] == 'beetles'
+    graph = core_response().data[1].alternatives[0].graph
+    assert sorted(graph.get_entities()) == [1, 4, 7, 10]
+    assert sorted(graph[0].get_entities()) == [1, 4]
+
+
+def test_walk_deeply_nested_relations():
+    relation = core_response().data[1].alternatives[0].graph[0]
+    for _ in range(5000):
+        relation = Relation(
+            [], False, None, [], None, relation.predicate, relation, [], [],
+            None, False, True, False, None, [], 1.0, False)
+    assert sum(1 for node in relation.walk()
+               if isinstance(node, Relation)) == 5001
+    assert sorted(relation.get_entities()) == [1, 4]
+
+
+def test_from_json_deeply_nested_relations():
+    relation_json = {'type': 'relation', 'predicate': {'verb': 'be'},
+                     'subject': {'type': 'entity', 'entity': 'it',
+                                 'index': 0}}
+    preposition_json = {'type': 'preposition', 'index': 0}
+    for i in range(5000):
+        relation_json = {'type': 'relation', 'predicate': {'verb': 'be'},
+                         'object': relation_json}
+        preposition_json = {'type': 'preposition', 'index': i + 1,
+                            'nestedPrepositions': [preposition_json]}
+    relation_json['prepositions'] = [preposition_json]
+    relation = Relation.from_json(relation_json, top_level=True)
+    assert relation.top_level and not relation.object.top_level
+    nodes = list(relation.walk())
+    assert sum(isinstance(n, Relation) for n in nodes) == 5001
+    assert sum(isinstance(n, Preposition) for n in nodes) == 5001
+    assert relation.prepositions[0].index == 5000
+    assert sorted(relation.get_entities()) == [0]
+
+
+def test_split_sentences():
+    text = 'One two. Three four! Five? Six seven eight nine ten. Eleven'
+    assert split_sentences(text, 20) == [(0, 9), (9, 27), (27, 53), (53, 59)]
+    assert split_sentences(text, 1000) == [(0, len(text))]
+    assert split_sentences('', 10) == []
+
+
+def test_post_document_stitches_chunks():
+    with StubServer() as server:
+        core = Plasticity('token', url=server.url).sapien.core
+        text = 'This is an example. ' * 5
+        result = core.post_document(text, chunk_size=40, ner=False)
+    assert server.request_count == 3
+    assert result.chunk_offsets == [0, 40, 80]
+    assert [s.offset for s in result.data] == [0, 40, 80]
+    assert result.request == {'text': text, 'ner': False}
+    assert len(result.tokenize()) == 15
+
+
+def test_fields_projection():
+    with StubServer() as server:
+        core = Plasticity('token', url=server.url).sapien.core
+        result = core.post('This is an example.', fields=['tokens'])
+        assert core.plasticity.codec.loads(server.request_bodies[-1]) == \
+            {'text': 'This is an example.', 'graph': False, 'ner': False}
+        assert result.tokenize() == ['This', 'is', 'an', 'example', '.']
+        assert result.data[0].dependencies is None
+        with pytest.raises(AttributeError):
+            result.dependencies()
+        results = list(core.post_many(
+            ['One.', {'text': 'Two.', 'graph': True}],
+            fields=['dependencies']))
+        assert [r.fields for r in results] == [{'dependencies'}] * 2
+        assert results[1].request == \
+            {'text': 'Two.', 'graph': True, 'ner': False}
+        assert results[0].data[0].tokens is None
+        assert len(results[0].dependencies()) == 5
+    with pytest.raises(ValueError):
+        core.post('One.', fields=['lemmas'])
+
+
+def test_fields_projection_applies_before_observers():
+    class Reader(Observer):
+        def post_response(self, event):
+            event.result.data
+
+    with StubServer() as server:
+        core = Plasticity('token', url=server.url,
+                          observers=[Reader()]).sapien.core
+        result = core.post('This is an example.', fields=['tokens'])
+        assert result.data[0].dependencies is None
+        results = list(core.post_many(
+            ['One.', (), 'Two.'], fields=['tokens']))
+        assert isinstance(results[1], core.BatchError)
+        assert results[0].data[0].dependencies is None
+        assert results[2].tokenize() == ['This', 'is', 'an', 'example', '.']
+
+
+def test_fields_projection_of_sentence_groups():
+    response = core_response()
+    response.fields = Core.get_fields(['ner'])
+    assert response.ner()[1][0][1]['entity'] == 'McCartney'
+    assert len(response.graphs()[0]) == 2
+    assert response.data[0].alternatives[0].tokens is None
+    with pytest.raises(AttributeError):
+        response.tokenize()
@@ -0,0 +1,172 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+import pytest
+
+from benchmarks import recorded
+from benchmarks.stub_server import StubServer
+from plasticity import Plasticity
+from plasticity.base.cache import DiskCache
+from plasticity.base.retry import Retry
+
+
+def test_endpoints_share_transport(server):
+    plasticity = Plasticity('token', url=server.url)
+    names, transform = plasticity.sapien.names, plasticity.sapien.transform
+    for _ in range(3):
+        assert not names.post('sarah').error
+        assert not transform.post('leaf', 'NounPlural').error
+    assert server.request_count == 6
+    assert server.connection_count == 1
+    plasticity.close()
+
+
+def test_post_over_pooled_session(server):
+    plasticity = Plasticity('token', url=server.url, pool_maxsize=2)
+    result = plasticity.sapien.core.post('This is an example.', graph=False)
+    assert not result.error
+    assert result.request == {'text': 'This is an example.', 'graph': False}
+    assert plasticity.sapien.transform.post('leaf', 'NounPlural').data == \
+        'leaves'
+    assert server.request_count == 2
+    plasticity.close()
+
+
+def test_post_many_in_order(server):
+    plasticity = Plasticity('token', url=server.url)
+    words = ['leaf', ('leaf', 'NounPlural'), {'word': 'leaf'}] * 10
+    results = list(plasticity.sapien.transform.post_many(
+        words, workers=4, pretty=True))
+    assert [r.request for r in results] == [
+        {'word': 'leaf', 'pretty': True},
+        {'word': 'leaf', 'action': 'NounPlural', 'pretty': True},
+        {'word': 'leaf'},
+    ] * 10
+    assert all(r.data == 'leaves' for r in results)
+
+
+def test_post_many_captures_errors(server):
+    plasticity = Plasticity('token', url=server.url)
+    results = list(plasticity.sapien.core.post_many(
+        ['One.', ('Two.', 'not json serializable', object()), 'Three.'],
+        as_completed=True))
+    assert len(results) == 3
+    errors = [r for r in results if r.error]
+    assert len(errors) == 1
+    assert errors[0].index == 1
+    assert isinstance(errors[0].exception, TypeError)
+
+
+def test_identical_requests_in_flight_are_coalesced():
+    with StubServer(latency=0.2) as server:
+        plasticity = Plasticity('token', url=server.url, coalesce=True)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            plasticity.sapien.names.post('sarah'))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert server.request_count == 1
+    assert plasticity.single_flight.stats() == {'calls': 1, 'coalesced': 7}
+    assert len(set(id(r) for r in results)) == 8
+    assert len(set(id(r.data) for r in results)) == 8
+
+
+def test_transient_errors_are_retried(server):
+    retry = Retry(backoff_factor=0)
+    plasticity = Plasticity('token', url=server.url, retries=retry)
+    server.failures.extend([(503, {}), (429, {'Retry-After': '0'})])
+    assert plasticity.sapien.transform.post('leaf').data == 'leaves'
+    assert server.request_count == 3
+    assert retry.retries == 2
+
+
+def test_retries_stop_when_exhausted(server):
+    plasticity = Plasticity(
+        'token', url=server.url, retries=Retry(total=1, backoff_factor=0))
+    server.failures.extend([(503, {})] * 3)
+    result = plasticity.sapien.transform.post('leaf')
+    assert result.error and result.error_code == 503
+    assert server.request_count == 2
+
+
+def test_retries_are_limited_by_budget(server):
+    retry = Retry(backoff_factor=0, budget=1, budget_ratio=0)
+    plasticity = Plasticity('token', url=server.url, retries=retry)
+    server.failures.extend([(502, {})] * 3)
+    assert plasticity.sapien.transform.post('leaf').error_code == 502
+    assert server.request_count == 2
+    assert retry.stats() == {'retries': 1, 'budget': 0}
+
+
+def test_long_retry_after_is_not_waited_for(server):
+    plasticity = Plasticity('token', url=server.url)
+    server.failures.append((429, {'Retry-After': '3600'}))
+    assert plasticity.sapien.transform.post('leaf').error_code == 429
+    assert server.request_count == 1
+
+
+def test_read_timeout():
+    with StubServer(latency=0.5) as server:
+        plasticity = Plasticity(
+            'token', url=server.url, read_timeout=0.05, retries=0)
+        with pytest.raises(plasticity.sapien.core.PlasticityAPITimeoutError):
+            plasticity.sapien.core.post('This is an example.')
+
+
+def test_retry_after_http_date():
+    class FakeResponse(object):
+        headers = {'retry-after': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+    assert Retry.get_retry_after(FakeResponse()) == 0.0
+    FakeResponse.headers = {'retry-after': 'soon'}
+    assert Retry.get_retry_after(FakeResponse()) is None
+
+
+def test_retry_after_is_capped_separately():
+    class FakeResponse(object):
+        headers = {'retry-after': '60'}
+    retry = Retry(max_backoff=1)
+    assert retry.get_wait(0, FakeResponse()) == 60
+    assert Retry(max_retry_after=59).get_wait(0, FakeResponse()) is None
+    assert retry.get_wait(0) <= 0.5
+
+
+def test_request_compression(tmpdir):
+    with StubServer(compress=('gzip',)) as server:
+        plasticity = Plasticity(
+            'token', url=server.url, compression='gzip', compress_min_size=64,
+            cache=DiskCache(str(tmpdir.join('cache.sqlite'))))
+        text = 'This is an example. ' * 10
+        result = plasticity.sapien.core.post(text, ner=False)
+        assert result.tokenize()[0] == 'This'
+        assert 'gzip, deflate' in plasticity.sapien.core.headers[
+            'accept-encoding']
+        assert server.bytes_received < len(server.request_bodies[-1])
+        assert plasticity.codec.loads(server.request_bodies[-1]) == \
+            {'text': text, 'ner': False}
+        assert plasticity.sapien.core.post(text, ner=False).data
+        assert server.request_count == 1
+        # Bodies under compress_min_size are sent as is
+        received = server.bytes_received
+        plasticity.sapien.transform.post('leaf')
+        assert server.bytes_received - received == \
+            len(server.request_bodies[-1])
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        Plasticity('token', compression='lzma')
+
+
+def test_stub_server_replays_recordings_with_errors():
+    with StubServer(responses=recorded.responses(), error_rate=1.0,
+                    error_status=502, jitter=0.01) as server:
+        plasticity = Plasticity('token', url=server.url, retries=0)
+        assert plasticity.sapien.names.post('sarah').error_code == 502
+        server.error_rate = 0
+        assert plasticity.sapien.names.post('sarah').is_family_name() is False
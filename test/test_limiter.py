@@ -0,0 +1,79 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from benchmarks.stub_server import StubServer
+from plasticity import Plasticity
+from plasticity.base.limiter import AdaptiveConcurrency, RateLimiter, clock
+from plasticity.base.retry import Retry
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(50, burst=2)
+    start = time.time()
+    for _ in range(7):
+        limiter.acquire()
+    # The burst goes out at once, then one request every 20ms
+    assert time.time() - start >= 0.09
+    assert limiter.stats()['waiting'] == 0
+
+
+def test_concurrency_decreases_once_per_window():
+    concurrency = AdaptiveConcurrency(initial=8)
+    starts = [concurrency.acquire() for _ in range(4)]
+    for start in starts:
+        concurrency.release(start, overloaded=True)
+    assert concurrency.limit == 4
+    concurrency.release(concurrency.acquire(), overloaded=True)
+    assert concurrency.limit == 2
+    assert concurrency.stats() == {'limit': 2, 'in_flight': 0, 'waiting': 0}
+
+
+def test_concurrency_increases_additively():
+    concurrency = AdaptiveConcurrency(initial=2, max_limit=3)
+    for _ in range(3):
+        concurrency.release(concurrency.acquire(), overloaded=False)
+    assert concurrency.limit == 3
+    for _ in range(10):
+        concurrency.release(concurrency.acquire(), overloaded=False)
+    assert concurrency.limit == 3
+    concurrency.release(concurrency.acquire(), overloaded=None)
+    assert concurrency.limit == 3
+
+
+def test_slow_responses_signal_overload():
+    concurrency = AdaptiveConcurrency(initial=4, max_latency=0.01)
+    concurrency.release(clock() - 1, overloaded=False)
+    assert concurrency.limit == 2
+
+
+def test_concurrency_limits_requests_in_flight():
+    concurrency = AdaptiveConcurrency(initial=1)
+    start = concurrency.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(
+        target=lambda: acquired.set() or concurrency.acquire())
+    thread.start()
+    acquired.wait()
+    time.sleep(0.05)
+    assert concurrency.stats()['waiting'] == 1
+    concurrency.release(start)
+    thread.join()
+    assert concurrency.stats() == {'limit': 1, 'in_flight': 1, 'waiting': 0}
+
+
+def test_plasticity_shares_limits():
+    with StubServer() as server:
+        plasticity = Plasticity(
+            'token', url=server.url, pool_maxsize=8, rate_limit=1000,
+            concurrency=True, retries=Retry(backoff_factor=0))
+        assert plasticity.sapien.core.plasticity.transport.concurrency is \
+            plasticity.concurrency
+        server.failures.append((429, {}))
+        assert plasticity.sapien.transform.post('leaf').data == 'leaves'
+    assert plasticity.concurrency.limit == 4
+    assert plasticity.rate_limiter.rate == 1000
@@ -0,0 +1,117 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from benchmarks import recorded
+from benchmarks.stub_server import StubServer
+from plasticity import Plasticity
+from plasticity.sapien.names import (
+    NameRecord, Names, NamesLexicon, classify_many)
+from plasticity.utils.bloom import BloomFilter
+
+NON_NAME = {
+    'data': dict((field, {'value': False, 'confidence': 'Certain'})
+                 for field in NamesLexicon.FIELDS),
+    'error': False,
+}
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    words = ['word{}'.format(i) for i in range(1000)]
+    for word in words:
+        bloom.add(word)
+    assert all(word in bloom for word in words)
+    false_positives = sum('other{}'.format(i) in bloom for i in range(10000))
+    assert false_positives < 300
+    copy = BloomFilter.from_bytes(bloom.to_bytes())
+    assert (copy.size, copy.hashes, len(copy)) == \
+        (bloom.size, bloom.hashes, 1000)
+    assert copy.capacity == 1000
+    assert all(word in copy for word in words)
+
+
+def test_names_lexicon_classify(tmpdir):
+    path = str(tmpdir.join('names'))
+    with StubServer(responses=recorded.responses()) as server:
+        names = Plasticity('token', url=server.url).sapien.names
+        names.lexicon = NamesLexicon(path)
+        results = names.classify(['sarah', 'ann', 'sarah'])
+        assert server.request_count == 2
+        assert [r.is_female_name() for r in results] == [True] * 3
+        assert names.classify(['ann'])[0].request == {'name': 'ann'}
+        assert names.post('sarah').is_family_name() is False
+        assert server.request_count == 2
+        names.lexicon.save()
+    lexicon = NamesLexicon(path)
+    assert len(lexicon) == 2
+    assert lexicon.get('sarah') == recorded.load('names')['data']
+    assert lexicon.get('bob') is None
+
+
+def test_names_lexicon_passes_bad_names_through():
+    with StubServer(responses=recorded.responses()) as server:
+        names = Plasticity('token', url=server.url).sapien.names
+        names.lexicon = NamesLexicon()
+        assert names.post({'pretty': True}).request == {'pretty': True}
+        names.post({'name': 5})
+        results = names.classify([None, 'sarah', ['x']])
+        assert server.request_count == 5
+        assert results[0] is not results[2]
+        assert len(names.lexicon) == 1
+
+
+def test_names_lexicon_prefilters_non_names(tmpdir):
+    path = str(tmpdir.join('names'))
+    with StubServer(responses={'/sapien/names/': NON_NAME}) as server:
+        names = Plasticity('token', url=server.url).sapien.names
+        names.lexicon = NamesLexicon(path, capacity=1000)
+        assert not names.classify(['the', 'of'])[0].is_name()
+        names.lexicon.save()
+        names.lexicon = NamesLexicon(path)
+        results = names.classify(['the', 'of', 'the'])
+        assert server.request_count == 2
+    assert not any(r.is_name() for r in results)
+    assert results[0].data['isName'] == {'value': False, 'confidence': None}
+    assert len(names.lexicon) == 0 and 'of' in names.lexicon
+
+
+def names_response(data):
+    return Names.Response(recorded.raw_response(
+        {'data': data, 'error': False}, {'name': 'x'}))
+
+
+def test_names_response_predicates():
+    response = names_response(recorded.load('names')['data'])
+    assert response.record == NameRecord(
+        True, 'Certain', False, 'Certain', True, 'Certain', False, 'Likely')
+    assert response.is_name() and response.is_female_name()
+    assert response.is_first_name()
+    assert response.is_male_name() is False
+    assert response.is_family_name() is False
+    empty = names_response({'isName': {'value': True}})
+    assert empty.is_name() is False
+    assert empty.is_male_name() is None
+
+
+def test_classify_many():
+    responses = [
+        names_response(recorded.load('names')['data']),
+        names_response(NON_NAME['data']),
+        names_response({'isMaleName': {'value': True,
+                                       'confidence': 'Certain'}}),
+        Names.BatchError(3, {'name': 'x'}, ValueError()),
+    ]
+    flags = classify_many(responses)
+    assert len(flags) == 4
+    assert list(flags.is_name) == [1, 0, 0, 0]
+    assert list(flags.is_first_name) == [1, 0, 1, 0]
+    assert list(flags.is_male_name) == [0, 0, 1, 0]
+    assert list(flags.is_family_name) == [0, 0, 0, 0]
+    assert [bool(f) for f in flags.is_female_name] == \
+        [bool(r.is_female_name()) for r in responses[:3]] + [False]
+    np = pytest.importorskip('numpy')
+    assert flags.to_numpy()['is_first_name'].dtype == np.bool_
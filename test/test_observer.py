@@ -0,0 +1,92 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from plasticity import Plasticity
+from plasticity.base.cache import MemoryCache
+from plasticity.base.observer import Histogram, Metrics, Observer
+
+
+class Recorder(Observer):
+
+    def __init__(self):
+        self.calls = []
+
+    def pre_request(self, event):
+        self.calls.append(('pre_request', event))
+
+    def post_response(self, event):
+        self.calls.append(('post_response', event))
+
+    def on_error(self, event):
+        self.calls.append(('on_error', event))
+
+
+def test_observers_receive_phase_timings(server):
+    recorder = Recorder()
+    plasticity = Plasticity('token', url=server.url, observers=[recorder])
+    result = plasticity.sapien.core.post('This is an example.', ner=False)
+    assert [name for name, _ in recorder.calls] == \
+        ['pre_request', 'post_response']
+    event = recorder.calls[1][1]
+    assert event.endpoint == 'sapien/core'
+    assert event.result is result and not event.error
+    assert event.status_code == 200 and not event.cached
+    assert set(event.timings) == \
+        {'network', 'first_byte', 'decode', 'build', 'total'}
+    assert event.timings['total'] >= event.timings['network']
+    assert event.bytes_out == len(b'{"text":"This is an example.",'
+                                  b'"ner":false}')
+    assert event.bytes_in > 0
+    assert result.tokenize()[0] == 'This'
+
+
+def test_observers_are_told_of_errors(server):
+    recorder = Recorder()
+    plasticity = Plasticity('token', url=server.url, observers=[recorder],
+                            cache=MemoryCache(replay_only=True))
+    with pytest.raises(plasticity.sapien.names.PlasticityCacheMissError):
+        plasticity.sapien.names.post('sarah')
+    name, event = recorder.calls[-1]
+    assert name == 'on_error' and event.error
+    assert isinstance(event.exception,
+                      plasticity.sapien.names.PlasticityCacheMissError)
+    assert list(event.timings) == ['total']
+
+
+def test_metrics(server):
+    metrics = Metrics()
+    plasticity = Plasticity('token', url=server.url, observers=[metrics],
+                            cache=MemoryCache(), retries=0)
+    for _ in range(3):
+        plasticity.sapien.transform.post('leaf', 'NounPlural')
+    server.failures.append((500, {}))
+    assert plasticity.sapien.names.post('sarah').error
+    snapshot = metrics.snapshot()
+    transform = snapshot['sapien/transform']
+    assert transform['requests'] == 3 and transform['cached'] == 2
+    assert transform['errors'] == 0
+    assert transform['latency']['total']['count'] == 3
+    assert transform['latency']['first_byte']['count'] == 1
+    assert snapshot['sapien/names']['errors'] == 1
+    text = metrics.to_prometheus()
+    assert 'plasticity_requests_total{endpoint="sapien/transform"} 3' in text
+    assert ('plasticity_request_seconds_count{endpoint="sapien/transform",'
+            'phase="total"} 3') in text
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_histogram_quantile():
+    histogram = Histogram(bounds=(1, 2, 4))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 3):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.quantile(1.0) == 4
+    histogram.observe(100)
+    assert histogram.quantile(1.0) == 4
@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from benchmarks.stub_server import StubServer
+from plasticity import Plasticity
+from plasticity.sapien.transform import TransformStore
+from plasticity.utils.table import SortedTable
+
+
+def test_sorted_table(tmpdir):
+    path = str(tmpdir.join('table'))
+    SortedTable.write(path, [(b'b', b'2'), (b'a', b'1'), (b'c', b''),
+                             (b'a', b'one')])
+    table = SortedTable(path)
+    assert len(table) == 3
+    assert table.get(b'a') == b'one'
+    assert table.get(b'c') == b''
+    assert table.get(b'bb') is None and b'0' not in table
+    assert list(table.items()) == [(b'a', b'one'), (b'b', b'2'), (b'c', b'')]
+    table.close()
+    SortedTable.write(path, [])
+    assert len(SortedTable(path)) == 0
+    tmpdir.join('bad').write('not a table')
+    with pytest.raises(ValueError):
+        SortedTable(str(tmpdir.join('bad')))
+
+
+def test_transform_store_warm_and_save(tmpdir):
+    path = str(tmpdir.join('transforms'))
+    with StubServer() as server:
+        transform = Plasticity('token', url=server.url).sapien.transform
+        transform.store = TransformStore(path)
+        assert transform.warm(['leaf', 'tree', 'leaf'],
+                              ['NounPlural', 'NounSingular']) == 4
+        assert transform.warm(['leaf'], ['NounPlural']) == 0
+        assert server.request_count == 4
+        result = transform.post('leaf', 'NounPlural')
+        assert result.data == 'leaves' and not result.error
+        assert result.request == {'word': 'leaf', 'action': 'NounPlural'}
+        assert transform.post('leaf', 'VerbPast').data == 'leaves'
+        assert server.request_count == 5
+        transform.store.save()
+    store = TransformStore(path)
+    assert len(store) == 5
+    assert store.get('tree', 'NounSingular') == 'leaves'
+    assert store.get('tree', 'VerbPast') is None
+    store.set('tree', 'VerbPast', 'treed')
+    assert ('tree', 'VerbPast') in store and len(store) == 6
+
+
+def test_transform_store_load_tsv(tmpdir):
+    tsv = tmpdir.join('transforms.tsv')
+    tsv.write_text('leaf\tNounPlural\tleaves\neat\tVerbPast\tate\n\n',
+                   encoding='utf-8')
+    store = TransformStore()
+    store.load_tsv(str(tsv))
+    assert store.get('eat', 'VerbPast') == 'ate'
+    with pytest.raises(ValueError):
+        store.save()
+    tsv.write_text('leaf\tNounPlural\tleaves\n\neat VerbPast ate\n',
+                   encoding='utf-8')
+    with pytest.raises(ValueError, match='Line 3 of'):
+        store.load_tsv(str(tsv))
@@ -28,3 +28,17 @@ def test_deep_get_not_found():
     a = {'x': {'a': 1, 'b': '', 'c': {'d': '2'}}, 'y': 5}
     assert utils.deep_get(a, 'z') is None
     assert utils.deep_get(a, 'x', 'z') is None
+
+
+def test_key_path():
+    a = {'x': {'a': 1, 'b': '', 'c': {'d': '2'}}, 'y': 5}
+    path = utils.KeyPath('x', 'c', 'd')
+    assert path(a) == path.get(a) == '2'
+    assert utils.KeyPath('y').get(a) == 5
+    assert utils.KeyPath('y').get(None) is None
+    assert path({'x': {'c': 'not a dict'}}) is None
+    assert path({}) is None
+    assert utils.KeyPath('x', 'a')(a) == 1
+    assert utils.KeyPath('y', 'z')(a) is None
+    assert utils.KeyPath()(a) is a
+    assert repr(utils.KeyPath('x', 'a')) == "KeyPath('x', 'a')"